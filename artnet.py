@@ -0,0 +1,109 @@
+import socket
+import struct
+import threading
+
+ARTNET_PORT = 6454
+ARTNET_ID = b"Art-Net\x00"
+OP_DMX = 0x5000
+PROTOCOL_VERSION = 14
+DMX_SLOTS = 512
+
+# ID, OpCode (little endian), ProtVer, Sequence, Physical, SubUni, Net, Length (big endian)
+ARTDMX_HEADER = struct.Struct("<8sH2sBBBB2s")
+HEADER_SIZE = ARTDMX_HEADER.size
+
+
+class ArtNetNode:
+    # One UDP socket per destination. Universes write into their own preallocated ArtDmx
+    # packet and are marked dirty; flush() sends every dirty universe in one burst per tick.
+    def __init__(self, host="255.255.255.255", port=ARTNET_PORT, log_func=print):
+        self.host = host
+        self.port = port
+        self.log = log_func
+        self.sock = None
+        self.lock = threading.Lock()
+        self.universes = {}
+        self.dirty = []
+
+    def open(self):
+        if self.sock:
+            return
+        try:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self.log(f"✅ Art-Net output to {self.host}:{self.port}.")
+        except OSError as e:
+            self.log(f"❌ Failed to open Art-Net socket: {e}")
+            self.sock = None
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+            self.log(f"🔌 Closed Art-Net output to {self.host}:{self.port}.")
+
+    def is_open(self):
+        return self.sock is not None
+
+    def universe(self, net_universe):
+        if net_universe not in self.universes:
+            self.universes[net_universe] = ArtNetUniverse(self, net_universe)
+        return self.universes[net_universe]
+
+    def mark_dirty(self, output):
+        with self.lock:
+            if output not in self.dirty:
+                self.dirty.append(output)
+
+    def flush(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, []
+        if not self.sock:
+            return
+        address = (self.host, self.port)
+        for output in dirty:
+            try:
+                self.sock.sendto(output.packet_view[:output.packet_length], address)
+            except OSError as e:
+                self.log(f"❌ Error sending Art-Net universe {output.net_universe}: {e}")
+
+
+class ArtNetUniverse:
+    # Same interface as DMXSerial (send_dmx_frame/is_open/open/close) for one Art-Net universe.
+    def __init__(self, node, net_universe):
+        self.node = node
+        self.net_universe = net_universe
+        self.sequence = 0
+
+        self.packet = bytearray(HEADER_SIZE + DMX_SLOTS)
+        self.packet_view = memoryview(self.packet)
+        self.packet_length = HEADER_SIZE + 2
+        ARTDMX_HEADER.pack_into(self.packet, 0, ARTNET_ID, OP_DMX, struct.pack(">H", PROTOCOL_VERSION),
+                                0, 0, net_universe & 0xFF, (net_universe >> 8) & 0x7F, b"\x00\x02")
+
+    def open(self):
+        self.node.open()
+
+    def close(self):
+        self.node.close()
+
+    def is_open(self):
+        return self.node.is_open()
+
+    def send_dmx_frame(self, dmx_data):
+        count = min(len(dmx_data), DMX_SLOTS)
+        length = max(2, count + (count & 1))  # ArtDmx wants an even slot count of at least 2
+
+        self.packet_view[HEADER_SIZE:HEADER_SIZE + count] = dmx_data[:count]
+        if length > count:
+            self.packet_view[HEADER_SIZE + count:HEADER_SIZE + length] = bytes(length - count)
+
+        self.sequence = self.sequence % 255 + 1  # 0 disables sequencing on receivers
+        self.packet[12] = self.sequence
+        self.packet[16] = length >> 8
+        self.packet[17] = length & 0xFF
+        self.packet_length = HEADER_SIZE + length
+        self.node.mark_dirty(self)
+
+    def flush_frame(self):
+        self.node.flush()
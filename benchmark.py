@@ -0,0 +1,224 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+
+import chase_cache
+from chase_library import ChaseLibrary
+from chase_player import ChasePlayer
+from dmx_engine import DMXEngine
+from dmx_serial import DMXSerial
+from osc_handler import MODE_SINGLE, MODE_THREADED, OSCHandler
+
+
+class MemorySerial:
+    # Stands in for serial.Serial so the whole output path runs without hardware. With
+    # simulate_wire, flush() waits as long as the frame would take on a real DMX line.
+    def __init__(self, baudrate=250000, simulate_wire=False):
+        self.baudrate = baudrate
+        self.simulate_wire = simulate_wire
+        self.is_open = True
+        self.break_condition = False
+        self.frames = 0
+        self.bytes_written = 0
+        self.pending_bytes = 0
+
+    def write(self, data):
+        self.frames += 1
+        self.bytes_written += len(data)
+        self.pending_bytes = len(data)
+
+    def flush(self):
+        if self.simulate_wire:
+            time.sleep(self.pending_bytes * 11 / self.baudrate)  # 8N2 plus start bit
+        self.pending_bytes = 0
+
+    def close(self):
+        self.is_open = False
+
+
+def quiet(message):
+    pass
+
+
+def write_chase(path, frames, channels, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        for _ in range(frames):
+            writer.writerow([rng.randint(0, 255) for _ in range(channels)])
+
+
+def open_fake_dmx(simulate_wire):
+    dmx = DMXSerial("bench", 250000, quiet)
+    dmx.serial = MemorySerial(250000, simulate_wire)
+    return dmx
+
+
+def bench_csv_load(workdir, frames, channels):
+    path = os.path.join(workdir, f"load_{frames}x{channels}.csv")
+    write_chase(path, frames, channels)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+
+    start = time.perf_counter()
+    rows = chase_cache.parse_csv(path, quiet)
+    parse_s = time.perf_counter() - start
+
+    target = chase_cache.cache_path(path)
+    start = time.perf_counter()
+    chase_cache.compile_csv(path, target, quiet)
+    compile_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = chase_cache.ChaseData(target)
+    mmap_s = time.perf_counter() - start
+
+    return {
+        "frames": len(rows),
+        "channels": data.channels,
+        "csv_mb": round(size_mb, 3),
+        "parse_s_per_mb": round(parse_s / size_mb, 4),
+        "compile_s_per_mb": round(compile_s / size_mb, 4),
+        "cached_load_ms": round(mmap_s * 1000, 3),
+    }
+
+
+def bench_transmit(frames_to_send):
+    dmx = open_fake_dmx(False)
+    frame = bytes(range(256)) * 2
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    for _ in range(frames_to_send):
+        dmx.send_dmx_frame(frame)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - start_cpu
+    # Each frame includes the 112µs break/MAB sleeps; CPU time is what the path itself costs.
+    return {
+        "frames": frames_to_send,
+        "wall_us_per_frame": round(elapsed / frames_to_send * 1e6, 2),
+        "cpu_us_per_frame": round(cpu / frames_to_send * 1e6, 2),
+    }
+
+
+def bench_playback(chase_paths, chase_count, framerate, duration, simulate_wire):
+    dmx = open_fake_dmx(simulate_wire)
+    dmx.start_writer()
+    library = ChaseLibrary(log_func=quiet)
+    engine = DMXEngine([(0, dmx)], framerate, log_func=quiet)
+    players = [ChasePlayer(chase_paths[i % len(chase_paths)], loop=True, engine=engine, log_func=quiet, library=library)
+               for i in range(chase_count)]
+
+    engine.start()
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    for player in players:
+        player.play()
+    time.sleep(duration)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - start_cpu
+    stats = engine.get_stats()
+    for player in players:
+        player.stop()
+    engine.stop()
+    dmx.close()
+
+    return {
+        "chases": chase_count,
+        "target_fps": framerate,
+        "achieved_fps": round(stats["frames"] / elapsed, 2),
+        "wire_frames": dmx.serial.frames,
+        "jitter_p50_ms": stats["jitter_p50_ms"],
+        "jitter_p99_ms": stats["jitter_p99_ms"],
+        "jitter_max_ms": stats["jitter_max_ms"],
+        "dropped_frames": stats["dropped_frames"],
+        "cpu_percent": round(cpu / elapsed * 100, 2),
+        "cpu_percent_per_chase": round(cpu / elapsed * 100 / chase_count, 3),
+    }
+
+
+def bench_osc_latency(chase_path, mode, framerate, triggers, port):
+    from pythonosc.udp_client import SimpleUDPClient
+
+    dmx = open_fake_dmx(False)
+    engine = DMXEngine([(0, dmx)], framerate, log_func=quiet)
+    osc = OSCHandler(port, quiet, mode, scheduler=engine.scheduler)
+    player = ChasePlayer(chase_path, engine=engine, log_func=quiet, library=ChaseLibrary(log_func=quiet))
+
+    def trigger(addr, *args):
+        # Same path as LightingService: the start is scheduled onto the next engine tick.
+        received = osc.receipt_time()
+        prepared = player.prepare()
+        if prepared is not None:
+            engine.schedule(osc.cue_time(), lambda: player.start(prepared, trigger_time=received))
+
+    osc.register_chase("/bench", trigger)
+
+    engine.start()
+    osc.start()
+    client = SimpleUDPClient("127.0.0.1", port)
+    for _ in range(triggers):
+        client.send_message("/bench", 1)
+        time.sleep(2.5 / framerate)
+        player.stop()
+        time.sleep(random.uniform(0, 1.0 / framerate))  # land triggers at random tick phases
+    time.sleep(0.1)
+    osc.stop()
+    engine.stop()
+
+    result = engine.get_latency_stats()
+    result["mode"] = mode
+    result["framerate"] = framerate
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hardware-free benchmarks for the OSC -> DMX pipeline.")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per playback run")
+    parser.add_argument("--chases", default="1,10,50", help="comma-separated concurrent chase counts")
+    parser.add_argument("--framerate", type=int, default=44)
+    parser.add_argument("--triggers", type=int, default=50, help="OSC triggers per latency run")
+    parser.add_argument("--osc-port", type=int, default=9797)
+    parser.add_argument("--simulate-wire", action="store_true", help="make the fake port take real DMX wire time")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="osc_lighting_bench_")
+    previous_cache_dir = chase_cache.CACHE_DIR
+    chase_cache.CACHE_DIR = os.path.join(workdir, "cache")
+    try:
+        chase_paths = []
+        for i in range(4):
+            path = os.path.join(workdir, f"chase_{i}.csv")
+            write_chase(path, 300, 512, seed=i)
+            chase_paths.append(path)
+
+        results = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "csv_load": bench_csv_load(workdir, 1000, 512),
+            "transmit": bench_transmit(2000),
+            "playback": [bench_playback(chase_paths, int(count), args.framerate, args.duration, args.simulate_wire)
+                         for count in args.chases.split(",")],
+            "osc_latency": [bench_osc_latency(chase_paths[0], mode, args.framerate, args.triggers, args.osc_port + i)
+                            for i, mode in enumerate((MODE_THREADED, MODE_SINGLE))],
+        }
+    finally:
+        chase_cache.CACHE_DIR = previous_cache_dir
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
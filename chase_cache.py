@@ -0,0 +1,162 @@
+import csv
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import weakref
+
+CACHE_DIR = ".chase_cache"
+CACHE_EXT = ".dmxc"
+
+# Header: magic, format version, channels per frame, frame count. Frames follow as a
+# fixed-width uint8 array of frames x channels, so frame i starts at HEADER_SIZE + i * channels.
+MAGIC = b"DMXC"
+VERSION = 1
+HEADER = struct.Struct("<4sBxHI")
+HEADER_SIZE = HEADER.size
+MAX_CHANNELS = 512 * 64  # global channel space of up to 64 universes
+IDENTITY_LUT = bytes(range(256))
+
+
+class FrameBuffer:
+    def __init__(self, view, channels, frame_count):
+        self.view = view
+        self.channels = channels
+        self.frame_count = frame_count
+
+    @property
+    def nbytes(self):
+        return len(self.view)
+
+    def __len__(self):
+        return self.frame_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.frame_count
+        if not 0 <= index < self.frame_count:
+            raise IndexError("frame index out of range")
+        start = index * self.channels
+        return self.view[start:start + self.channels]
+
+    def scaled(self, lut):
+        # Applies a 256-entry lookup table to every frame in one C-level pass.
+        if lut == IDENTITY_LUT:
+            return self
+        return FrameBuffer(memoryview(bytes(self.view).translate(lut)), self.channels, self.frame_count)
+
+
+class ChaseData(FrameBuffer):
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, channels, frame_count = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported chase cache file: {path}")
+        if len(self.buffer) < HEADER_SIZE + channels * frame_count:
+            raise ValueError(f"Truncated chase cache file: {path}")
+
+        view = memoryview(self.buffer)[HEADER_SIZE:HEADER_SIZE + channels * frame_count]
+        super().__init__(view, channels, frame_count)
+
+
+_loaded = weakref.WeakValueDictionary()  # cache key -> ChaseData shared by every player
+_loaded_lock = threading.Lock()
+_loading = {}  # cache key -> lock held while that chase is being compiled or mapped
+
+
+def cache_key(csv_path):
+    stat = os.stat(csv_path)
+    source = f"{os.path.abspath(csv_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_path(csv_path, key=None):
+    path_id = hashlib.sha1(os.path.abspath(csv_path).encode("utf-8")).hexdigest()[:12]
+    key = key or cache_key(csv_path)
+    return os.path.join(CACHE_DIR, f"{path_id}-{key}{CACHE_EXT}")
+
+
+def parse_rows(f, log_func=print):
+    for row in csv.reader(f):
+        if len(row) > MAX_CHANNELS:
+            log_func(f"⚠️ Skipped row with more than {MAX_CHANNELS} channels: {len(row)}")
+            continue
+        yield bytes(min(255, max(0, int(v))) for v in row if v.strip().isdigit())
+
+
+def parse_csv(csv_path, log_func=print):
+    with open(csv_path, "r") as f:
+        return list(parse_rows(f, log_func))
+
+
+def compile_csv(csv_path, target, log_func=print):
+    frames = parse_csv(csv_path, log_func)
+    channels = max((len(frame) for frame in frames), default=0)
+
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, channels, len(frames)))
+        for frame in frames:
+            f.write(frame.ljust(channels, b"\x00"))
+    os.replace(tmp_path, target)
+    _remove_stale(target)
+
+
+def _remove_stale(target):
+    # Drop cache files for older versions of the same CSV (same path id, different key).
+    directory, name = os.path.split(target)
+    path_id = name.split("-", 1)[0]
+    for entry in os.listdir(directory or "."):
+        if entry.startswith(f"{path_id}-") and entry.endswith(CACHE_EXT) and entry != name:
+            try:
+                os.remove(os.path.join(directory, entry))
+            except OSError:
+                pass  # still mapped by another process; it will be replaced next time
+
+
+def load_chase(csv_path, log_func=print):
+    key = cache_key(csv_path)
+    with _loaded_lock:
+        data = _loaded.get(key)
+        if data is not None:
+            return data
+        guard = _loading.setdefault(key, threading.Lock())
+
+    # Compile and map outside _loaded_lock so loading one chase does not hold up lookups of
+    # others; the per-key guard keeps two threads from compiling the same file.
+    with guard:
+        with _loaded_lock:
+            data = _loaded.get(key)
+        if data is not None:
+            return data
+
+        try:
+            target = cache_path(csv_path, key)
+            if not os.path.exists(target):
+                compile_csv(csv_path, target, log_func)
+                log_func(f"🗜️ Compiled {os.path.basename(csv_path)} to binary chase cache.")
+
+            try:
+                data = ChaseData(target)
+            except ValueError:
+                compile_csv(csv_path, target, log_func)
+                data = ChaseData(target)
+        finally:
+            with _loaded_lock:
+                _loading.pop(key, None)
+                if data is not None:
+                    _loaded[key] = data
+        return data
+
+
+@functools.lru_cache(maxsize=64)
+def brightness_lut(level=255, master=255):
+    level = min(255, max(0, int(level)))
+    master = min(255, max(0, int(master)))
+    return bytes(min(255, value * level * master // (255 * 255)) for value in range(256))
@@ -0,0 +1,88 @@
+import array
+import re
+
+ENCODING_AUTO = "auto"
+ENCODING_DELTA = "delta"
+ENCODING_DENSE = "dense"
+ENCODINGS = (ENCODING_AUTO, ENCODING_DELTA, ENCODING_DENSE)
+
+# "auto" keeps a chase dense unless its deltas need at most this fraction of the dense size;
+# past that the per-channel apply loop costs more than copying whole frames.
+AUTO_MAX_RATIO = 0.25
+
+_CHANGED = re.compile(b"[^\x00]")
+
+
+class DeltaFrames:
+    # Frame 0 stored whole, then only the (channel, value) pairs that change from one frame to
+    # the next, packed into flat arrays. Frame i's changes are slots/values[offsets[i]:offsets[i + 1]],
+    # so the changes for any run of consecutive frames are one contiguous slice.
+    def __init__(self, base, offsets, slots, values, channels):
+        self.base = base
+        self.offsets = offsets  # array('I'), frame_count + 1 entries
+        self.slots = slots      # array('H'), 0-based channel of each change
+        self.values = values    # array('B')
+        self.channels = channels
+        self.frame_count = len(offsets) - 1
+
+    @property
+    def nbytes(self):
+        return (len(self.base) + self.offsets.itemsize * len(self.offsets)
+                + self.slots.itemsize * len(self.slots) + len(self.values))
+
+    def __len__(self):
+        return self.frame_count
+
+
+class DeltaCursor:
+    # A player's private copy of the current frame; seeking forward writes only the changed
+    # channels into it. Seeking backwards (a loop wrapping around) restarts from frame 0.
+    def __init__(self, frames):
+        self.frames = frames
+        self.state = bytearray(frames.base)
+        self.view = memoryview(self.state)
+        self.index = 0
+
+    def seek(self, index):
+        frames = self.frames
+        if index < self.index:
+            self.state[:] = frames.base
+            self.index = 0
+        if index > self.index:
+            start = frames.offsets[self.index + 1]
+            end = frames.offsets[index + 1]
+            state = self.state
+            for slot, value in zip(frames.slots[start:end], frames.values[start:end]):
+                state[slot] = value
+            self.index = index
+        return self.view
+
+
+def encode_deltas(frames):
+    channels = frames.channels
+    offsets = array.array("I", [0, 0])
+    slots = array.array("H")
+    values = array.array("B")
+    previous = int.from_bytes(frames[0], "big")
+    for index in range(1, len(frames)):
+        frame = frames[index]
+        current = int.from_bytes(frame, "big")
+        changed = previous ^ current
+        if changed:
+            # XOR leaves non-zero bytes exactly where channels changed; the regex finds them in C.
+            for match in _CHANGED.finditer(changed.to_bytes(channels, "big")):
+                slot = match.start()
+                slots.append(slot)
+                values.append(frame[slot])
+        offsets.append(len(slots))
+        previous = current
+    return DeltaFrames(bytes(frames[0]), offsets, slots, values, channels)
+
+
+def encode_frames(frames, encoding=ENCODING_AUTO):
+    if encoding == ENCODING_DENSE or not len(frames):
+        return frames
+    deltas = encode_deltas(frames)
+    if encoding == ENCODING_AUTO and deltas.nbytes > frames.nbytes * AUTO_MAX_RATIO:
+        return frames
+    return deltas
@@ -0,0 +1,180 @@
+import collections
+import os
+import threading
+
+from chase_cache import cache_key, load_chase
+from chase_delta import DeltaFrames, ENCODING_AUTO, encode_frames
+from metrics import REGISTRY
+
+MAX_SCALED_COPIES = 2  # pre-scaled copies kept per chase (e.g. current and previous brightness)
+NOT_RESIDENT = "not resident"  # ChasePlayer.prepare(load=False): the chase has to be loaded first
+
+
+class LibraryEntry:
+    def __init__(self, key, frames):
+        self.key = key
+        self.frames = frames
+        self.scaled = collections.OrderedDict()  # lut -> FrameBuffer
+        self.users = 0
+
+    @property
+    def nbytes(self):
+        return self.frames.nbytes + sum(frames.nbytes for frames in self.scaled.values())
+
+
+class ChaseLibrary:
+    # Loads each chase once and shares its frames (and pre-scaled copies) between every
+    # player and OSC trigger. Idle chases are evicted least-recently-used first whenever the
+    # resident size goes over the memory budget; chases that are playing are never evicted.
+    def __init__(self, memory_budget_mb=256, log_func=print, encoding=ENCODING_AUTO):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.log = log_func
+        self.encoding = encoding
+        self.entries = collections.OrderedDict()  # absolute path -> LibraryEntry, LRU first
+        self.lock = threading.RLock()
+        self.loading = {}  # absolute path -> lock held while that chase is being loaded
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.metric_hits = REGISTRY.counter("chase_library_hits_total", "Chase acquisitions served from memory")
+        self.metric_misses = REGISTRY.counter("chase_library_misses_total", "Chase acquisitions that had to load the file")
+        self.metric_evictions = REGISTRY.counter("chase_library_evictions_total", "Idle chases evicted to stay under the memory budget")
+        REGISTRY.gauge("chase_library_resident_bytes", "Bytes of chase frames and pre-scaled copies in memory", self.resident_bytes)
+        REGISTRY.gauge("chase_library_budget_bytes", "Memory budget for resident chases", lambda: self.memory_budget)
+        REGISTRY.gauge("chase_library_chases", "Chases resident in memory", lambda: len(self.entries))
+
+    def preload(self, filepath):
+        frames = self.acquire(filepath)
+        self.release(filepath)
+        return len(frames)
+
+    def acquire(self, filepath):
+        path = os.path.abspath(filepath)
+        key = cache_key(path)
+        with self.lock:
+            entry = self._use(path, key)
+            if entry is not None:
+                return entry.frames
+            guard = self.loading.setdefault(path, threading.Lock())
+
+        # Parse and encode outside self.lock, which the engine takes every tick via scaled() and
+        # release(). The per-path guard makes a second caller wait for this load instead of
+        # repeating it.
+        with guard:
+            with self.lock:
+                entry = self._use(path, key)
+                if entry is not None:
+                    return entry.frames
+            try:
+                frames = self._load(path)
+            finally:
+                with self.lock:
+                    self.loading.pop(path, None)
+
+            with self.lock:
+                self.misses += 1
+                self.metric_misses.inc()
+                previous = self.entries.get(path)
+                entry = LibraryEntry(key, frames)
+                entry.users = (previous.users if previous else 0) + 1
+                self.entries[path] = entry
+                self.entries.move_to_end(path)
+                self._evict()
+                return entry.frames
+
+    def acquire_resident(self, filepath):
+        # acquire() without the load: None unless the current version of the chase is already in
+        # memory, so a latency-sensitive caller can hand the miss to a loader thread instead.
+        path = os.path.abspath(filepath)
+        key = cache_key(path)
+        with self.lock:
+            entry = self._use(path, key)
+            return entry.frames if entry is not None else None
+
+    def release(self, filepath):
+        with self.lock:
+            entry = self.entries.get(os.path.abspath(filepath))
+            if entry is not None and entry.users > 0:
+                entry.users -= 1
+            self._evict()
+
+    def scaled(self, filepath, frames, lut):
+        with self.lock:
+            entry = self.entries.get(os.path.abspath(filepath))
+            if entry is None or entry.frames is not frames:
+                return frames.scaled(lut)
+
+            scaled = entry.scaled.get(lut)
+            if scaled is None:
+                scaled = frames.scaled(lut)
+                entry.scaled[lut] = scaled
+                while len(entry.scaled) > MAX_SCALED_COPIES:
+                    entry.scaled.popitem(last=False)
+                self._evict()
+            else:
+                entry.scaled.move_to_end(lut)
+            return scaled
+
+    def resident_bytes(self):
+        with self.lock:
+            return sum(entry.nbytes for entry in self.entries.values())
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "chases": len(self.entries),
+                "playing": sum(1 for entry in self.entries.values() if entry.users),
+                "resident_bytes": self.resident_bytes(),
+                "memory_budget_bytes": self.memory_budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "delta_encoded": sum(1 for entry in self.entries.values() if isinstance(entry.frames, DeltaFrames)),
+            }
+
+    def _use(self, path, key):
+        entry = self.entries.get(path)
+        if entry is None or entry.key != key:
+            return None
+        self.hits += 1
+        self.metric_hits.inc()
+        self.entries.move_to_end(path)
+        entry.users += 1
+        self._evict()
+        return entry
+
+    def _load(self, path):
+        dense = load_chase(path, self.log)
+        frames = encode_frames(dense, self.encoding)
+        if isinstance(frames, DeltaFrames):
+            self.log(f"🧮 Delta-encoded {os.path.basename(path)}: {dense.nbytes // 1024} KB -> {frames.nbytes // 1024} KB")
+        return frames
+
+    def _evict(self):
+        resident = self.resident_bytes()
+        if resident <= self.memory_budget:
+            return
+        for path in list(self.entries):
+            entry = self.entries[path]
+            if entry.users:
+                continue
+            del self.entries[path]
+            self.evictions += 1
+            self.metric_evictions.inc()
+            resident -= entry.nbytes
+            self.log(f"♻️ Evicted idle chase {os.path.basename(path)} from memory.")
+            if resident <= self.memory_budget:
+                break
+
+
+_default_library = None
+
+
+def default_library():
+    global _default_library
+    if _default_library is None:
+        _default_library = ChaseLibrary()
+    return _default_library
@@ -1,27 +1,55 @@
-import csv
-import threading
-import time
 import os
-import signal
+import time
+
+from chase_cache import IDENTITY_LUT, brightness_lut
+from chase_delta import DeltaCursor, DeltaFrames
+from chase_library import NOT_RESIDENT, default_library
+from chase_stream import ChaseStream, should_stream
+from frame_clock import PlaybackStats
+from interpolation import Interpolator, LINEAR, MODES
+
+MAX_SPEED = 16.0
+SCALE_SETTLE_SECONDS = 0.5  # a level/master value must hold this long before the whole chase is re-scaled
 
 class ChasePlayer:
-    def __init__(self, filepath, loop=False, mute=False, framerate=30, brightness=255, dmx_sender=None, log_func=print):
+    def __init__(self, filepath, loop=False, mute=False, level=255, engine=None, log_func=print, library=None, stream=None, preload=True,
+                 source_fps=None, interpolation=LINEAR, channel_interpolation=None):
         self.filepath = filepath
         self.loop = loop
         self.mute = mute
-        self.framerate = framerate
-        self.brightness = brightness
-        self.dmx_sender = dmx_sender
+        self.level = level
+        self.speed = 1.0
+        self.engine = engine
         self.log = log_func
+        self.library = library or default_library()
+        # None picks streaming for large files; small files stay pinned in the library.
+        self.streaming = should_stream(filepath) if stream is None else stream
+        self.stream = None
+        self.stream_phase = 0.0
 
-        self.frames = []
-        self.play_thread = None
-        self.stop_flag = threading.Event()
+        # With a source rate the chase is authored as keyframes and blended up to the engine rate;
+        # without one every row is an output frame, as before.
+        self.source_fps = source_fps or None
+        self.interpolation = self._check_mode(interpolation)
+        self.channel_interpolation = {channel: self._check_mode(mode) for channel, mode in (channel_interpolation or {}).items()}
+        self.interpolator = None
 
-        self.valid_csv = self.load_csv()
-        signal.signal(signal.SIGINT, self._handle_interrupt)
+        self.frames = None  # shared library frames, only held while playing
+        self.position = 0
+        self.scaled_frames = None  # pre-scaled copy of self.frames for scaled_key
+        self.scaled_key = None
+        self.pending_key = None  # (level, master) not yet pre-scaled, and when it was first seen
+        self.pending_since = 0.0
+        self.cursors = [None, None]  # current and next keyframe of a delta-encoded chase
+        self.trigger_time = None
+        self.last_latency = None
+        self.stats = PlaybackStats()
 
-    def load_csv(self):
+        # Without preload only the path is checked; frames load on first play or via load_csv().
+        self.preloaded = False
+        self.valid_csv = self.load_csv() if preload else self.check_file()
+
+    def check_file(self):
         if not self.filepath.lower().endswith(".csv"):
             self.log(f"❌ Invalid file type: {self.filepath}")
             return False
@@ -29,77 +57,246 @@ class ChasePlayer:
         if not os.path.exists(self.filepath):
             self.log(f"❌ File not found: {self.filepath}")
             return False
+        return True
+
+    def load_csv(self):
+        if not self.check_file():
+            return False
+
+        if self.streaming:
+            self.preloaded = True
+            self.log(f"📼 Streaming {os.path.basename(self.filepath)} from disk.")
+            return True
 
         try:
-            with open(self.filepath, 'r') as f:
-                reader = csv.reader(f)
-                self.frames = []
-                for row in reader:
-                    if len(row) > 512:
-                        self.log(f"⚠️ Skipped row with more than 512 channels: {len(row)}")
-                        continue
-                    frame = [min(255, max(0, int(v))) for v in row if v.strip().isdigit()]
-                    self.frames.append(frame)
-
-            self.log(f"✅ Loaded {len(self.frames)} frames from {os.path.basename(self.filepath)}")
-            return True if self.frames else False
+            frame_count = self.library.preload(self.filepath)
+            self.preloaded = True
+            self.log(f"✅ Loaded {frame_count} frames from {os.path.basename(self.filepath)}")
+            return True if frame_count else False
         except Exception as e:
             self.log(f"❌ Error reading CSV: {e}")
             return False
 
-    def play(self):
+    def play(self, trigger_time=None):
+        prepared = self.prepare()
+        if prepared is not None:
+            self.start(prepared, trigger_time)
+
+    def prepare(self, load=True):
+        # The half of play() that may touch the disk, so it can run off the engine thread. Returns
+        # what start() needs (the chase's library frames, or an unstarted stream), None if the
+        # chase cannot play, or NOT_RESIDENT when load is False and the frames are not in memory.
         if not self.valid_csv:
             self.log("❌ Cannot play: Invalid or missing CSV file.")
-            return
+            return None
 
         if self.mute:
             self.log("🔇 Chase is muted. Playback skipped.")
-            return
+            return None
+
+        if not self.engine:
+            self.log("⚠️ No DMX engine attached. Cannot send DMX.")
+            return None
 
-        if not self.dmx_sender or not self.dmx_sender.is_open():
+        if not self.engine.has_open_output():
             self.log("⚠️ Serial port is not open. Cannot send DMX.")
-            return
+            return None
+
+        if self.is_playing():
+            self.log("⏳ Chase is already playing.")
+            return None
+
+        if self.streaming:
+            return ChaseStream(self.filepath, self.loop, log_func=self.log)
+
+        try:
+            frames = self.library.acquire(self.filepath) if load else self.library.acquire_resident(self.filepath)
+        except Exception as e:
+            self.log(f"❌ Error reading CSV: {e}")
+            return None
+
+        if frames is None:
+            return NOT_RESIDENT
 
-        if not self.frames:
+        if not len(frames):
+            self.library.release(self.filepath)
             self.log("🚫 No valid frames to play.")
-            return
+            return None
+        return frames
 
-        if self.play_thread and self.play_thread.is_alive():
+    def start(self, prepared, trigger_time=None):
+        # Starts playback from what prepare() returned; does no file I/O, so it is safe as a cue
+        # on the engine thread.
+        if self.is_playing():
             self.log("⏳ Chase is already playing.")
+            self.discard(prepared)
             return
 
-        self.stop_flag.clear()
-        self.play_thread = threading.Thread(target=self._play_loop, daemon=True)
-        self.play_thread.start()
+        if isinstance(prepared, ChaseStream):
+            self._play_stream(prepared, trigger_time)
+            return
 
-    def _play_loop(self):
-        self.log(f"▶️ Playing chase: {os.path.basename(self.filepath)} ({'Looping' if self.loop else 'Once'})")
-        interval = 1.0 / max(1, self.framerate)
+        frames = prepared
+        if frames is not self.frames:
+            self.scaled_frames = None
+            self.scaled_key = None
+            self.cursors = [None, None]
+        self.frames = frames
+        self.position = 0
+        self.trigger_time = trigger_time  # monotonic OSC receipt time, for trigger-to-light latency
+        self.stats.reset()
+        if self.engine.add_player(self):
+            self.log(f"▶️ Playing chase: {os.path.basename(self.filepath)} ({'Looping' if self.loop else 'Once'})")
+        else:
+            self.library.release(self.filepath)
 
-        try:
-            while not self.stop_flag.is_set():
-                for frame in self.frames:
-                    if self.stop_flag.is_set():
-                        break
-                    if self.dmx_sender:
-                        scaled_frame = [min(255, int(val * self.brightness / 255)) for val in frame]
-                        self.dmx_sender.send_dmx_frame(scaled_frame)
-                    time.sleep(interval)
-
-                if not self.loop:
-                    break
-        finally:
+    def discard(self, prepared):
+        # Gives back what prepare() took when the start never happens.
+        if not isinstance(prepared, ChaseStream):
+            self.library.release(self.filepath)
+
+    def _play_stream(self, stream, trigger_time):
+        # Registered straight away; render() returns empty frames until the producer catches up.
+        self.stream = stream
+        self.stream.start()
+        self.trigger_time = trigger_time
+        self.stats.reset()
+        self.stream_phase = 1.0 - self._step()  # the first tick reads frame 0
+        if self.engine.add_player(self):
+            self.log(f"▶️ Streaming chase: {os.path.basename(self.filepath)} ({'Looping' if self.loop else 'Once'})")
+        else:
+            self.stream.close()
+
+    def render(self, ticks=1):
+        # Called once per engine tick; returns the next frame or None when the chase is done.
+        # ticks > 1 means the engine dropped frames, so skip ahead to stay on wall-clock time.
+        stream = self.stream
+        if stream is not None:
+            # Streams are read front to back, so rate and speed only change how many frames are
+            # consumed per tick; there is no blending.
+            self.stream_phase += ticks * self._step()
+            advance = int(self.stream_phase)
+            self.stream_phase -= advance
+            frame = stream.next_frame(advance)
+            if frame is None:
+                return None
+            master = self.engine.master_brightness if self.engine else 255
+            return frame.translate(brightness_lut(self.level, master))
+
+        frames = self.frames
+        if frames is None:
+            return None  # stopped from another thread mid-tick
+
+        step = self._step()
+        position = self.position + (ticks - 1) * step
+        count = len(frames)
+        if position >= count:
+            if not self.loop:
+                return None
+            position %= count
+
+        index = int(position)
+        fraction = position - index
+        self.position = position + step
+        if not self.source_fps or fraction == 0:
+            return self._frame_at(frames, index)
+
+        following = index + 1
+        if following >= count:
+            following = 0 if self.loop else index
+        if following == index:
+            return self._frame_at(frames, index)
+        interpolator = self.interpolator
+        if interpolator is None or interpolator.channels != frames.channels:
+            interpolator = Interpolator(frames.channels, self.interpolation, self.channel_interpolation)
+            self.interpolator = interpolator
+        return interpolator.blend(self._frame_at(frames, index), self._frame_at(frames, following, 1), fraction)
+
+    def _frame_at(self, frames, index, cursor_slot=0):
+        if not isinstance(frames, DeltaFrames):
+            return self._scaled_frame(frames, index)
+
+        # Delta chases are rebuilt in this player's own buffer and scaled on the way out, which
+        # is a single 512-byte translate rather than a pre-scaled copy of the whole chase.
+        cursor = self.cursors[cursor_slot]
+        if cursor is None or cursor.frames is not frames:
+            cursor = DeltaCursor(frames)
+            self.cursors[cursor_slot] = cursor
+        frame = cursor.seek(index)
+        master = self.engine.master_brightness if self.engine else 255
+        lut = brightness_lut(self.level, master)
+        return frame if lut == IDENTITY_LUT else cursor.state.translate(lut)
+
+    def _step(self):
+        # Rows advanced per engine tick: one per tick, or the keyframe rate relative to the engine
+        # rate, times the live speed control.
+        if not self.source_fps:
+            return self.speed
+        framerate = self.engine.framerate if self.engine else self.source_fps
+        return self.source_fps / framerate * self.speed
+
+    def _check_mode(self, mode):
+        if mode not in MODES:
+            self.log(f"⚠️ Unknown interpolation '{mode}' for {os.path.basename(self.filepath)}, using {LINEAR}.")
+            return LINEAR
+        return mode
+
+    def set_level(self, level):
+        self.level = min(255, max(0, int(level)))
+
+    def set_speed(self, speed):
+        # 1.0 is the authored speed, 0 holds the current frame.
+        self.speed = min(MAX_SPEED, max(0.0, float(speed)))
+
+    def _scaled_frame(self, frames, index):
+        # The whole chase is pre-scaled once the level and master brightness have settled. While
+        # a fader is moving, only the frame being output is translated, so the cost per tick
+        # does not grow with chase length.
+        master = self.engine.master_brightness if self.engine else 255
+        key = (self.level, master)
+        scaled = self.scaled_frames
+        if key == self.scaled_key and scaled is not None:
+            return scaled[index]
+
+        now = time.monotonic()
+        if key != self.pending_key:
+            self.pending_key = key
+            self.pending_since = now
+        lut = brightness_lut(*key)
+        if now - self.pending_since < SCALE_SETTLE_SECONDS:
+            frame = frames[index]
+            return frame if lut == IDENTITY_LUT else bytes(frame).translate(lut)
+
+        scaled = self.library.scaled(self.filepath, frames, lut)
+        self.scaled_frames = scaled
+        self.scaled_key = key
+        self.pending_key = None
+        return scaled[index]
+
+    def _on_finished(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
             self.log(f"⏹️ Finished chase: {os.path.basename(self.filepath)}")
+            return
+
+        # Drop our references so the library may evict the chase while it is idle.
+        self.frames = None
+        self.scaled_frames = None
+        self.scaled_key = None
+        self.cursors = [None, None]
+        self.library.release(self.filepath)
+        self.log(f"⏹️ Finished chase: {os.path.basename(self.filepath)}")
 
     def stop(self):
-        self.stop_flag.set()
-        if self.play_thread and self.play_thread.is_alive():
-            self.play_thread.join()
+        if self.engine:
+            self.engine.remove_player(self)
 
-    def is_playing(self):
-        return self.play_thread and self.play_thread.is_alive()
+    def get_stats(self):
+        stats = self.stats.snapshot()
+        if self.stream is not None:
+            stats["stream_underruns"] = self.stream.underruns
+        return stats
 
-    def _handle_interrupt(self, signum, frame):
-        self.log("🔌 KeyboardInterrupt received. Stopping chase playback...")
-        self.stop()
-        exit(0)
+    def is_playing(self):
+        return bool(self.engine) and self.engine.is_active(self)
@@ -0,0 +1,86 @@
+import os
+import queue
+import threading
+
+from chase_cache import parse_rows
+
+STREAM_THRESHOLD_MB = 16  # CSVs larger than this are streamed instead of loaded whole
+END_OF_STREAM = None
+
+
+class ChaseStream:
+    # A producer thread parses CSV rows ahead of the playhead into a bounded queue, so memory
+    # stays at `prefetch` frames however long the file is. Looping rewinds the file.
+    def __init__(self, filepath, loop=False, prefetch=256, log_func=print):
+        self.filepath = filepath
+        self.loop = loop
+        self.log = log_func
+        self.frames = queue.Queue(maxsize=prefetch)
+        self.stop_flag = threading.Event()
+        self.producer_thread = None
+        self.last_frame = b""
+        self.finished = False
+        self.underruns = 0
+
+    def start(self):
+        self.producer_thread = threading.Thread(target=self._produce, name=f"stream-{os.path.basename(self.filepath)}", daemon=True)
+        self.producer_thread.start()
+
+    def close(self):
+        self.stop_flag.set()
+        # Unblock a producer waiting on a full queue.
+        try:
+            while True:
+                self.frames.get_nowait()
+        except queue.Empty:
+            pass
+
+    def next_frame(self, ticks=1):
+        # Returns the frame for this tick (skipping ticks - 1 frames), the previous frame if
+        # the producer has fallen behind, or None once a non-looping stream has ended.
+        if self.finished:
+            return None
+        for _ in range(ticks):
+            try:
+                frame = self.frames.get_nowait()
+            except queue.Empty:
+                self.underruns += 1
+                return self.last_frame
+            if frame is END_OF_STREAM:
+                self.finished = True
+                return None
+            self.last_frame = frame
+        return self.last_frame
+
+    def _produce(self):
+        try:
+            with open(self.filepath, "r") as f:
+                while not self.stop_flag.is_set():
+                    produced = 0
+                    for frame in parse_rows(f, self.log):
+                        if self.stop_flag.is_set():
+                            return
+                        self._put(frame)
+                        produced += 1
+
+                    if not self.loop or not produced:
+                        break
+                    f.seek(0)
+        except Exception as e:
+            self.log(f"❌ Error streaming CSV: {e}")
+        self._put(END_OF_STREAM)
+
+    def _put(self, frame):
+        while not self.stop_flag.is_set():
+            try:
+                self.frames.put(frame, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+def should_stream(filepath, threshold_mb=STREAM_THRESHOLD_MB):
+    try:
+        return os.path.getsize(filepath) > threshold_mb * 1024 * 1024
+    except OSError:
+        return False
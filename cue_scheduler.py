@@ -0,0 +1,77 @@
+import contextlib
+import heapq
+import itertools
+import threading
+import time
+
+MAX_AHEAD = 3600.0  # seconds; timetags further out are treated as clock errors
+
+
+def timetag_to_monotonic(timetag):
+    # OSC timetags arrive as wall-clock seconds; cues are kept on the monotonic clock.
+    if timetag is None:
+        return time.monotonic()
+    return time.monotonic() + (timetag - time.time())
+
+
+class CueScheduler:
+    # Min-heap of (due, seq, action) on the monotonic clock. OSC ingest pushes cues, the engine
+    # pops whatever is due at the start of each tick, so a cue starts on a tick boundary no matter
+    # when its packet arrived or which thread handled it.
+    def __init__(self, on_schedule=None, log_func=print):
+        self.heap = []
+        self.lock = threading.Lock()
+        self.seq = itertools.count()
+        self.local = threading.local()
+        self.on_schedule = on_schedule
+        self.log = log_func
+
+    def schedule(self, due, action):
+        if due - time.monotonic() > MAX_AHEAD:
+            self.log(f"⚠️ Ignored a cue timetagged {due - time.monotonic():.0f} s ahead; check the sender's clock.")
+            return
+        cue = (due, next(self.seq), action)
+        batch = getattr(self.local, "batch", None)
+        if batch is not None:
+            batch.append(cue)
+            return
+        with self.lock:
+            heapq.heappush(self.heap, cue)
+        if self.on_schedule:
+            self.on_schedule()
+
+    @contextlib.contextmanager
+    def batch(self):
+        # Cues scheduled inside become visible to the engine together, so every trigger in one
+        # OSC packet lands on the same tick even if a tick falls while the packet is dispatched.
+        self.local.batch = []
+        try:
+            yield
+        finally:
+            cues, self.local.batch = self.local.batch, None
+            if cues:
+                with self.lock:
+                    for cue in cues:
+                        heapq.heappush(self.heap, cue)
+                if self.on_schedule:
+                    self.on_schedule()
+
+    def next_due(self):
+        with self.lock:
+            return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, until):
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= until:
+                cue_due, _, action = heapq.heappop(self.heap)
+                due.append((cue_due, action))
+        return due
+
+    def pending(self):
+        with self.lock:
+            return len(self.heap)
+
+    def clear(self):
+        with self.lock:
+            self.heap.clear()
@@ -0,0 +1,289 @@
+import threading
+import time
+
+from cue_scheduler import CueScheduler
+from frame_clock import FrameClock, LatencyStats
+from metrics import REGISTRY
+
+UNIVERSE_SIZE = 512
+
+HTP = "HTP"  # Highest Takes Precedence
+LTP = "LTP"  # Latest Takes Precedence
+MERGE_MODES = (HTP, LTP)
+
+
+class DMXEngine:
+    def __init__(self, outputs=None, framerate=30, merge_mode=HTP, ltp_channels=None, master_brightness=255, log_func=print):
+        # outputs: (universe index, sender) pairs. Universe 0 carries global channels 1-512,
+        # universe 1 carries 513-1024, and so on; one sender can appear for several universes.
+        self.outputs = list(outputs or [])
+        self.framerate = framerate
+        self.master_brightness = master_brightness
+        self.log = log_func
+
+        # Network senders batch their universes and send them together once per tick.
+        self.flush_outputs = [sender for _, sender in self.outputs if hasattr(sender, "flush_frame")]
+        self.universe_count = max((universe + 1 for universe, _ in self.outputs), default=1)
+        self.channel_count = self.universe_count * UNIVERSE_SIZE
+        self.universe = bytearray(self.channel_count)  # global channel space across all universes
+        self.ltp_mask = bytearray(self.channel_count)  # 0xFF on channels merged LTP, 0x00 on HTP
+        # Scratch space for HTP: each channel widened to a 16-bit lane (see _highest).
+        self.wide_current = bytearray(2 * self.channel_count)
+        self.wide_frame = bytearray(2 * self.channel_count)
+        self.lane_carry = {}  # count -> 0x0100 in every lane
+        self.players = []  # in trigger order, so the last entry is the "latest" for LTP
+        self.lock = threading.Lock()
+        self.controls = {}  # key -> (apply, value); a newer value replaces one not yet applied
+        self.control_lock = threading.Lock()
+
+        self.clock = FrameClock(framerate)
+        self.latency_stats = LatencyStats()  # OSC receipt -> first frame handed to the outputs
+        self.metric_compose = REGISTRY.histogram("engine_compose_seconds", "Render, scale and merge of all active chases per tick")
+        self.metric_output = REGISTRY.histogram("engine_output_seconds", "Handing one tick to every output")
+        self.metric_jitter = REGISTRY.histogram("engine_tick_jitter_seconds", "Lateness of each tick against its deadline")
+        self.metric_latency = REGISTRY.histogram("engine_trigger_latency_seconds", "OSC receipt to first frame handed to the outputs")
+        self.metric_overruns = REGISTRY.counter("engine_overruns_total", "Ticks that missed at least one deadline")
+        self.metric_dropped = REGISTRY.counter("engine_dropped_frames_total", "Frames skipped to stay on wall-clock time")
+        self.metric_active = REGISTRY.gauge("engine_active_chases", "Chases mixed on the last tick")
+        self.metric_controls = REGISTRY.counter("engine_controls_applied_total", "Live control values applied at tick start")
+        self.metric_coalesced = REGISTRY.counter("engine_controls_coalesced_total", "Live control values replaced before they were applied")
+        self.metric_cues = REGISTRY.counter("engine_cues_started_total", "Scheduled cues run at tick start")
+        self.metric_cue_error = REGISTRY.histogram("engine_cue_offset_seconds", "Distance between a cue's due time and the tick it ran on")
+        self.engine_thread = None
+        self.stop_flag = threading.Event()
+        self.wake_flag = threading.Event()
+        self.scheduler = CueScheduler(self.wake_flag.set, log_func)
+
+        self.set_merge_mode(merge_mode)
+        if ltp_channels:
+            self.set_merge_mode(LTP, ltp_channels)
+
+    def set_merge_mode(self, mode, channels=None):
+        # Channels are 1-based global addresses; None applies the mode to every channel.
+        mode = str(mode).upper()
+        if mode not in MERGE_MODES:
+            self.log(f"⚠️ Unknown merge mode '{mode}', using {HTP}.")
+            mode = HTP
+        value = 0xFF if mode == LTP else 0x00
+
+        with self.lock:
+            if channels is None:
+                self.ltp_mask[:] = bytes([value]) * self.channel_count
+                return
+            for channel in channels:
+                if 1 <= channel <= self.channel_count:
+                    self.ltp_mask[channel - 1] = value
+                else:
+                    self.log(f"⚠️ Ignored merge mode for out-of-range channel {channel}.")
+
+    def set_master_brightness(self, value):
+        # Players pick the new value up on their next tick; no restart needed.
+        self.master_brightness = min(255, max(0, int(value)))
+
+    def submit_control(self, key, apply, value):
+        # Called from OSC ingest. Only the latest value per key is kept and apply(value) runs on
+        # the engine thread at the start of the next tick, so fader streams never queue up.
+        with self.control_lock:
+            if key in self.controls:
+                self.metric_coalesced.inc()
+            self.controls[key] = (apply, value)
+
+    def schedule(self, due, action):
+        # Runs action() on the engine thread at the tick nearest to due (monotonic seconds).
+        self.scheduler.schedule(due, action)
+
+    def start(self):
+        if self.engine_thread and self.engine_thread.is_alive():
+            return
+        self.stop_flag.clear()
+        self.engine_thread = threading.Thread(target=self._run, daemon=True)
+        self.engine_thread.start()
+        self.log(f"🎛️ DMX engine running at {self.framerate} fps.")
+
+    def stop(self):
+        self.stop_flag.set()
+        self.wake_flag.set()
+        if self.engine_thread and self.engine_thread.is_alive():
+            self.engine_thread.join()
+        self.scheduler.clear()
+        with self.lock:
+            players, self.players = self.players, []
+        for player in players:
+            player._on_finished()
+
+    def add_player(self, player):
+        with self.lock:
+            if player in self.players:
+                return False
+            self.players.append(player)
+        self.wake_flag.set()
+        return True
+
+    def remove_player(self, player):
+        with self.lock:
+            if player not in self.players:
+                return False
+            self.players.remove(player)
+        player._on_finished()
+        return True
+
+    def has_open_output(self):
+        return any(sender.is_open() for _, sender in self.outputs)
+
+    def is_active(self, player):
+        with self.lock:
+            return player in self.players
+
+    def active_count(self):
+        with self.lock:
+            return len(self.players)
+
+    def get_stats(self):
+        return self.clock.stats.snapshot()
+
+    def get_latency_stats(self):
+        return self.latency_stats.snapshot()
+
+    def _run(self):
+        clock = self.clock
+        clock.stats.reset()
+        while not self.stop_flag.is_set():
+            if not self.players:
+                # Nothing to mix: leave the wire alone so fixtures hold their last frame, but
+                # wake up for the next scheduled cue.
+                due = self.scheduler.next_due()
+                remaining = None if due is None else due - time.monotonic()
+                if remaining is None or remaining > 0:
+                    self.wake_flag.wait(remaining)
+                    self.wake_flag.clear()
+                    clock.reset()
+                    continue
+                clock.reset()
+
+            if clock.framerate != self.framerate:
+                clock.set_framerate(self.framerate)
+
+            ticks = clock.wait(self.stop_flag)
+            if self.stop_flag.is_set():
+                break
+            self.metric_jitter.observe(clock.last_jitter)
+            if clock.last_dropped:
+                self.metric_overruns.inc()
+                self.metric_dropped.inc(clock.last_dropped)
+            self._render_tick(ticks)
+
+    def _apply_controls(self):
+        with self.control_lock:
+            controls, self.controls = self.controls, {}
+        for apply, value in controls.values():
+            try:
+                apply(value)
+            except Exception as e:
+                self.log(f"❌ Live control update failed: {e}")
+        self.metric_controls.inc(len(controls))
+
+    def _run_cues(self):
+        # Cues due within half a period of this tick's deadline start now: the nearest tick.
+        tick_time = self.clock.tick_time
+        cues = self.scheduler.pop_due(tick_time + self.clock.period / 2)
+        if not cues:
+            return None
+        with self.lock:
+            existing = set(self.players)
+        for due, action in cues:
+            self.metric_cue_error.observe(abs(tick_time - due))
+            try:
+                action()
+            except Exception as e:
+                self.log(f"❌ Scheduled cue failed: {e}")
+        self.metric_cues.inc(len(cues))
+        return existing
+
+    def _render_tick(self, ticks=1):
+        started = time.perf_counter()
+        if self.controls:
+            self._apply_controls()
+        existing = self._run_cues() if self.scheduler.heap else None
+        with self.lock:
+            players = list(self.players)
+        self.metric_active.set(len(players))
+
+        universe = self.universe
+        universe[:] = bytes(self.channel_count)
+        used = 0
+        finished = []
+        triggered = []
+
+        for player in players:
+            player.stats.record(self.clock.last_jitter, self.clock.last_dropped)
+            # Chases started by a cue this tick begin at their first frame even after a stall.
+            frame = player.render(ticks if existing is None or player in existing else 1)
+            if frame is None:
+                finished.append(player)
+                continue
+            if player.trigger_time is not None:
+                triggered.append(player)
+            used = max(used, self._merge(frame))
+
+        for player in finished:
+            self.remove_player(player)
+
+        composed = time.perf_counter()
+        self.metric_compose.observe(composed - started)
+        if used:
+            self._send(used)
+            self.metric_output.observe(time.perf_counter() - composed)
+
+        if triggered:
+            now = time.monotonic()
+            for player in triggered:
+                player.last_latency = now - player.trigger_time
+                player.trigger_time = None
+                self.latency_stats.record(player.last_latency)
+                self.metric_latency.observe(player.last_latency)
+
+    def _send(self, used):
+        view = memoryview(self.universe)
+        for universe, sender in self.outputs:
+            start = universe * UNIVERSE_SIZE
+            count = min(UNIVERSE_SIZE, used - start)
+            if count > 0:
+                sender.send_dmx_frame(view[start:start + count])
+        for sender in self.flush_outputs:
+            sender.flush_frame()
+
+    def _merge(self, frame):
+        count = min(len(frame), self.channel_count)
+        if not count:
+            return 0
+
+        mask = self.ltp_mask[:count]
+        frame = bytes(frame[:count])
+        if not any(mask):
+            self.universe[:count] = self._highest(count, frame)
+        elif mask.count(0xFF) == count:
+            self.universe[:count] = frame
+        else:
+            # Per-channel select: LTP channels take this frame, HTP channels take the max.
+            mask_bits = int.from_bytes(mask, "big")
+            highest = self._highest(count, frame)
+            merged = (int.from_bytes(highest, "big") & ~mask_bits) | (int.from_bytes(frame, "big") & mask_bits)
+            self.universe[:count] = merged.to_bytes(count, "big")
+        return count
+
+    def _highest(self, count, frame):
+        # Per-channel max of the universe so far and frame, without a Python call per channel.
+        # Both are widened to 16-bit lanes; (a | 0x100) - b keeps bit 8 exactly where a >= b and
+        # never borrows across lanes, so that bit turned into a 0xFF mask selects a or b per lane.
+        width = 2 * count
+        carry = self.lane_carry.get(count)
+        if carry is None:
+            carry = self.lane_carry[count] = int.from_bytes(b"\x00\x01" * count, "little")
+
+        self.wide_current[0:width:2] = self.universe[:count]
+        self.wide_frame[0:width:2] = frame
+        a = int.from_bytes(memoryview(self.wide_current)[:width], "little")
+        b = int.from_bytes(memoryview(self.wide_frame)[:width], "little")
+        a_wins = (((a | carry) - b) & carry) >> 8
+        highest = b ^ ((a ^ b) & (a_wins * 0xFF))
+        return highest.to_bytes(width, "little")[0::2]
@@ -2,14 +2,70 @@ import serial
 import threading
 import time
 
+from metrics import REGISTRY
+
+DMX_SLOTS = 512
+MIN_SLOTS = 24  # shortest frame receivers are guaranteed to accept
+BREAK_TIME = 0.0001
+MAB_TIME = 0.000012
+BITS_PER_SLOT = 11  # start bit, 8 data bits, 2 stop bits
+RESEND_ALWAYS = "always"
+RESEND_CHANGED = "changed"
+
+
 class DMXSerial:
-    def __init__(self, port, baudrate=250000, log_func=print):
+    def __init__(self, port, baudrate=250000, log_func=print, resend_mode=RESEND_ALWAYS, keepalive_interval=0.8, log_interval=5.0, slots=0):
         self.port = port
         self.baudrate = baudrate
         self.log = log_func
         self.serial = None
         self.lock = threading.Lock()
 
+        # "changed" only resends when the frame differs, or after keepalive_interval
+        # seconds so receivers don't treat the line as lost.
+        self.resend_mode = resend_mode
+        self.keepalive_interval = keepalive_interval
+
+        # Start code + 512 slots, reused for every frame.
+        self.frame_buffer = bytearray(1 + DMX_SLOTS)
+        self.frame_view = memoryview(self.frame_buffer)
+        self.frame_length = 0
+        self.last_send_time = 0.0
+
+        # Slots on the wire: a fixed patch size, or 0 to send up to the highest channel that has
+        # ever been non-zero, so small rigs get shorter frames and a higher refresh rate.
+        self.patched_slots = min(DMX_SLOTS, max(0, int(slots or 0)))
+        self.slot_high_water = 0
+        self.slot_count = self.patched_slots or MIN_SLOTS
+
+        self.log_interval = log_interval
+        self.last_log_time = {}
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+        # With a writer thread, send_dmx_frame only copies into the back buffer and returns, so
+        # a slow adapter never holds up the engine or the other ports. The writer swaps the
+        # buffers and transmits the front one; a frame it has not taken yet is overwritten.
+        self.writer_thread = None
+        self.front_buffer = bytearray(DMX_SLOTS)
+        self.back_buffer = bytearray(DMX_SLOTS)
+        self.back_length = 0
+        self.frame_pending = False
+        self.buffer_lock = threading.Lock()
+        self.frame_ready = threading.Event()
+        self.writer_stop = threading.Event()
+
+        self.metric_lock_wait = REGISTRY.histogram("dmx_lock_wait_seconds", "Time spent waiting for DMXSerial.lock", port=port)
+        self.metric_break = REGISTRY.histogram("dmx_break_seconds", "BREAK plus MARK AFTER BREAK", port=port)
+        self.metric_write = REGISTRY.histogram("dmx_write_seconds", "serial.write of one frame", port=port)
+        self.metric_flush = REGISTRY.histogram("dmx_flush_seconds", "serial.flush after one frame", port=port)
+        self.metric_sent = REGISTRY.counter("dmx_frames_sent_total", "Frames written to the port", port=port)
+        self.metric_skipped = REGISTRY.counter("dmx_frames_skipped_total", "Unchanged frames not resent", port=port)
+        self.metric_replaced = REGISTRY.counter("dmx_frames_replaced_total", "Frames overwritten by a newer one before the writer sent them", port=port)
+        self.metric_errors = REGISTRY.counter("dmx_errors_total", "Serial errors while sending", port=port)
+        REGISTRY.gauge("dmx_slots", "Slots sent per frame", lambda: self.slot_count, port=port)
+        REGISTRY.gauge("dmx_max_refresh_hz", "Highest refresh the baud rate allows for the current slot count", self.max_refresh, port=port)
+
     def open(self):
         try:
             self.serial = serial.Serial(self.port, self.baudrate, timeout=1)
@@ -19,31 +75,138 @@ class DMXSerial:
             self.serial = None
 
     def close(self):
+        self.stop_writer()
         if self.serial and self.serial.is_open:
             self.serial.close()
             self.log(f"🔌 Closed serial port {self.port}.")
 
+    def start_writer(self):
+        if self.writer_thread and self.writer_thread.is_alive():
+            return
+        self.writer_stop.clear()
+        self.writer_thread = threading.Thread(target=self._writer_loop, name=f"dmx-writer-{self.port}", daemon=True)
+        self.writer_thread.start()
+        slots = self.patched_slots or DMX_SLOTS
+        self.log(f"📐 {self.port}: up to {self.max_refresh(slots):.0f} fps with {slots} slots at {self.baudrate} baud.")
+
+    def stop_writer(self):
+        if not self.writer_thread:
+            return
+        self.writer_stop.set()
+        self.frame_ready.set()
+        self.writer_thread.join()
+        self.writer_thread = None
+
+    def _writer_loop(self):
+        while True:
+            self.frame_ready.wait()
+            self.frame_ready.clear()
+            if self.writer_stop.is_set():
+                break
+            with self.buffer_lock:
+                if not self.frame_pending:
+                    continue
+                self.front_buffer, self.back_buffer = self.back_buffer, self.front_buffer
+                count = self.back_length
+                self.frame_pending = False
+            self._transmit(memoryview(self.front_buffer)[:count])
+
     def send_dmx_frame(self, dmx_data):
+        if self.writer_thread is not None:
+            count = min(len(dmx_data), DMX_SLOTS)
+            with self.buffer_lock:
+                if self.frame_pending:
+                    self.metric_replaced.inc()
+                self.back_buffer[:count] = dmx_data[:count]
+                self.back_length = count
+                self.frame_pending = True
+            self.frame_ready.set()
+            return
+        self._transmit(dmx_data)
+
+    def max_refresh(self, slots=None):
+        # Frames per second the line can carry: BREAK + MAB + start code and slots at 11 bits each.
+        slots = slots or self.slot_count
+        return 1.0 / (BREAK_TIME + MAB_TIME + (1 + slots) * BITS_PER_SLOT / self.baudrate)
+
+    def _update_slot_count(self):
+        if self.patched_slots:
+            return self.patched_slots
+        # rstrip finds the last non-zero slot in C; index 0 is the start code.
+        highest = max(0, len(self.frame_buffer.rstrip(b"\x00")) - 1)
+        if highest > self.slot_high_water:
+            self.slot_high_water = highest
+            self.slot_count = max(MIN_SLOTS, highest)
+        return self.slot_count
+
+    def _transmit(self, dmx_data):
         if not self.serial or not self.serial.is_open:
-            self.log("⚠️ Serial port is not open. Cannot send DMX.")
+            self._log_limited("closed", "⚠️ Serial port is not open. Cannot send DMX.")
             return
 
+        try:
+            data = memoryview(dmx_data)
+        except TypeError:
+            data = memoryview(bytes(dmx_data[:DMX_SLOTS]))
+        count = min(len(data), DMX_SLOTS)
+
+        waited = time.perf_counter()
         with self.lock:
+            self.metric_lock_wait.observe(time.perf_counter() - waited)
             try:
+                now = time.monotonic()
+                slots = self.frame_view[1:1 + count]
+                if (self.resend_mode == RESEND_CHANGED
+                        and count == self.frame_length
+                        and slots == data[:count]
+                        and now - self.last_send_time < self.keepalive_interval):
+                    self.frames_skipped += 1
+                    self.metric_skipped.inc()
+                    return
+
+                slots[:] = data[:count]
+                if count < self.frame_length:
+                    self.frame_view[1 + count:1 + self.frame_length] = bytes(self.frame_length - count)
+                self.frame_length = count
+                length = self._update_slot_count()
+
                 # DMX BREAK and MARK AFTER BREAK
+                started = time.perf_counter()
                 self.serial.break_condition = True
-                time.sleep(0.0001)  # 100µs break
+                time.sleep(BREAK_TIME)  # 100µs break
                 self.serial.break_condition = False
-                time.sleep(0.000012)  # 12µs MAB
+                time.sleep(MAB_TIME)  # 12µs MAB
+                broken = time.perf_counter()
 
                 # DMX START CODE + CHANNELS (max 512)
-                frame = bytes([0x00] + list(dmx_data[:512]))
-                self.serial.write(frame)
+                self.serial.write(self.frame_view[:1 + length])
+                written = time.perf_counter()
                 self.serial.flush()
-                self.log(f"➡️ Sent DMX frame with {len(dmx_data[:512])} channels.")
+                flushed = time.perf_counter()
+
+                self.metric_break.observe(broken - started)
+                self.metric_write.observe(written - broken)
+                self.metric_flush.observe(flushed - written)
+                self.metric_sent.inc()
+                self.last_send_time = now
+                self.frames_sent += 1
+
+                if self._log_limited("sent", f"➡️ Sent {self.frames_sent} DMX frames ({self.frames_skipped} unchanged skipped), last with {length} slots."):
+                    self.frames_sent = 0
+                    self.frames_skipped = 0
 
             except serial.SerialException as e:
+                self.metric_errors.inc()
                 self.log(f"❌ Error sending DMX frame: {e}")
 
+    def _log_limited(self, key, message):
+        # Per-frame messages are summarised at most once per log_interval.
+        now = time.monotonic()
+        if now - self.last_log_time.get(key, 0.0) < self.log_interval:
+            return False
+        self.last_log_time[key] = now
+        self.log(message)
+        return True
+
     def is_open(self):
         return self.serial is not None and self.serial.is_open
@@ -0,0 +1,171 @@
+import math
+
+from chase_cache import MAX_CHANNELS, brightness_lut
+from frame_clock import PlaybackStats
+
+SINE = "sine"
+RAINBOW = "rainbow"
+STROBE = "strobe"
+CHASE = "chase"
+EFFECTS = (SINE, RAINBOW, STROBE, CHASE)
+
+PHASES = 256  # waveform resolution: one full cycle is 256 table entries
+MAX_SPEED = 16.0
+
+
+def sine_table(low=0, high=255):
+    return bytes(round(low + (high - low) * (1 - math.cos(2 * math.pi * i / PHASES)) / 2) for i in range(PHASES))
+
+
+def square_table(duty=0.5, low=0, high=255):
+    lit = max(1, round(PHASES * min(1.0, max(0.0, duty))))
+    return bytes([high]) * lit + bytes([low]) * (PHASES - lit)
+
+
+def hue_table(high=255):
+    # One colour component around the hue circle; green and blue read it 1/3 and 2/3 of a cycle later.
+    third = PHASES / 3
+    return bytes(round(high * max(0.0, 1 - min(i, PHASES - i) / third)) for i in range(PHASES))
+
+
+class EffectPlayer:
+    # Generates frames instead of reading them. Each channel is given a fixed phase offset
+    # (0-255) once; per tick the waveform table is rotated by the current phase and scaled by the
+    # brightness LUT, and every channel is computed by one bytes.translate of the offsets.
+    def __init__(self, effect_data, engine=None, log_func=print, loop=True, mute=False, level=255):
+        self.name = effect_data.get("name") or effect_data.get("osc") or effect_data.get("effect", "")
+        self.effect = effect_data.get("effect", SINE)
+        self.loop = loop
+        self.mute = mute
+        self.level = level
+        self.speed = 1.0
+        self.engine = engine
+        self.log = log_func
+
+        self.period = max(0.01, float(effect_data.get("period", 1.0)))  # seconds per cycle
+        self.duration = effect_data.get("duration")  # seconds when not looping; default one cycle
+        self.phase = 0.0
+        self.elapsed = 0.0
+        self.trigger_time = None
+        self.last_latency = None
+        self.stats = PlaybackStats()
+        self.preloaded = True
+        self.valid_csv = self._build(effect_data)
+
+    def _build(self, data):
+        if self.effect not in EFFECTS:
+            self.log(f"❌ Unknown effect type: {self.effect}")
+            return False
+
+        start = int(data.get("start", 1))
+        count = int(data.get("count", 512))
+        if start < 1 or count < 1 or start - 1 + count > MAX_CHANNELS:
+            self.log(f"❌ Effect {self.name} channel range is out of bounds.")
+            return False
+
+        width = max(1, int(data.get("fixture_channels", 3 if self.effect == RAINBOW else 1)))
+        fixtures = max(1, count // width)
+        low = int(data.get("min", 0))
+        high = int(data.get("max", 255))
+        spread = float(data.get("spread", 1.0 if self.effect in (RAINBOW, CHASE) else 0.0))  # cycles across all fixtures
+
+        if self.effect == SINE:
+            self.table = sine_table(low, high)
+        elif self.effect == RAINBOW:
+            self.table = hue_table(high)
+        elif self.effect == STROBE:
+            self.table = square_table(float(data.get("duty", 0.1)), low, high)
+        else:
+            self.table = square_table(float(data.get("width", 1)) / fixtures, low, high)
+
+        offsets = bytearray(count)
+        for channel in range(count):
+            fixture, component = divmod(channel, width)
+            offset = -fixture * spread * PHASES / fixtures  # negative so positive spread travels up the rig
+            if self.effect == RAINBOW:
+                offset -= component * PHASES / 3
+            offsets[channel] = round(offset) % PHASES
+        self.padding = bytes(start - 1)
+        self.offsets = bytes(offsets)
+        return True
+
+    def load_csv(self):
+        return self.valid_csv
+
+    def play(self, trigger_time=None):
+        prepared = self.prepare()
+        if prepared is not None:
+            self.start(prepared, trigger_time)
+
+    def prepare(self, load=True):
+        # Same interface as ChasePlayer; an effect has nothing to load.
+        if not self.valid_csv:
+            self.log(f"❌ Cannot play: effect {self.name} is not configured correctly.")
+            return None
+
+        if self.mute:
+            self.log("🔇 Effect is muted. Playback skipped.")
+            return None
+
+        if not self.engine:
+            self.log("⚠️ No DMX engine attached. Cannot send DMX.")
+            return None
+
+        if not self.engine.has_open_output():
+            self.log("⚠️ Serial port is not open. Cannot send DMX.")
+            return None
+
+        if self.is_playing():
+            self.log("⏳ Effect is already playing.")
+            return None
+        return self.table
+
+    def start(self, prepared, trigger_time=None):
+        if self.is_playing():
+            self.log("⏳ Effect is already playing.")
+            return
+
+        self.phase = 0.0
+        self.elapsed = 0.0
+        self.trigger_time = trigger_time
+        self.stats.reset()
+        if self.engine.add_player(self):
+            self.log(f"✨ Playing effect: {self.name} ({self.effect}, {'Looping' if self.loop else 'Once'})")
+
+    def discard(self, prepared):
+        pass
+
+    def render(self, ticks=1):
+        framerate = self.engine.framerate if self.engine else 30
+        limit = self.duration if self.duration is not None else self.period
+        if not self.loop and self.elapsed >= limit:
+            return None
+
+        step = self.speed * PHASES / (self.period * framerate)
+        phase = self.phase + (ticks - 1) * step
+        self.phase = (phase + step) % PHASES
+        self.elapsed += ticks * self.speed / framerate
+
+        shift = int(phase) % PHASES
+        table = self.table[shift:] + self.table[:shift]
+        master = self.engine.master_brightness if self.engine else 255
+        return self.padding + self.offsets.translate(table.translate(brightness_lut(self.level, master)))
+
+    def set_level(self, level):
+        self.level = min(255, max(0, int(level)))
+
+    def set_speed(self, speed):
+        self.speed = min(MAX_SPEED, max(0.0, float(speed)))
+
+    def _on_finished(self):
+        self.log(f"⏹️ Finished effect: {self.name}")
+
+    def stop(self):
+        if self.engine:
+            self.engine.remove_player(self)
+
+    def get_stats(self):
+        return self.stats.snapshot()
+
+    def is_playing(self):
+        return bool(self.engine) and self.engine.is_active(self)
@@ -0,0 +1,118 @@
+import collections
+import threading
+import time
+
+
+class PlaybackStats:
+    def __init__(self, sample_size=2048):
+        self.lock = threading.Lock()
+        self.samples = collections.deque(maxlen=sample_size)
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.monotonic()
+            self.frames = 0
+            self.dropped = 0
+            self.overruns = 0
+            self.jitter_total = 0.0
+            self.jitter_max = 0.0
+            self.samples.clear()
+
+    def record(self, jitter, dropped=0):
+        with self.lock:
+            self.frames += 1
+            self.dropped += dropped
+            if dropped:
+                self.overruns += 1
+            self.jitter_total += jitter
+            if jitter > self.jitter_max:
+                self.jitter_max = jitter
+            self.samples.append(jitter)
+
+    def snapshot(self):
+        with self.lock:
+            samples = sorted(self.samples)
+            frames = self.frames
+            return {
+                "elapsed_s": round(time.monotonic() - self.started, 3),
+                "frames": frames,
+                "dropped_frames": self.dropped,
+                "overruns": self.overruns,
+                "jitter_mean_ms": round(self.jitter_total / frames * 1000, 3) if frames else 0.0,
+                "jitter_p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+                "jitter_p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+                "jitter_max_ms": round(self.jitter_max * 1000, 3),
+            }
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class FrameClock:
+    # Paces ticks against absolute monotonic deadlines (start + n * period), so time spent
+    # rendering and writing never accumulates into drift. Missed deadlines are dropped.
+    def __init__(self, framerate=30):
+        self.stats = PlaybackStats()
+        self.set_framerate(framerate)
+
+    def set_framerate(self, framerate):
+        self.framerate = framerate
+        self.period = 1.0 / max(1, framerate)
+        self.reset()
+
+    def reset(self):
+        self.next_deadline = time.monotonic()
+        self.tick_time = self.next_deadline  # deadline of the tick last returned by wait()
+        self.last_jitter = 0.0
+        self.last_dropped = 0
+
+    def wait(self, stop_flag=None):
+        # Blocks until the next deadline and returns how many ticks have elapsed since the
+        # previous call: 1 when on time, 1 + dropped frames when a deadline was missed.
+        remaining = self.next_deadline - time.monotonic()
+        if remaining > 0:
+            if stop_flag is not None:
+                stop_flag.wait(remaining)
+            else:
+                time.sleep(remaining)
+
+        now = time.monotonic()
+        lateness = max(0.0, now - self.next_deadline)
+        dropped = int(lateness // self.period)
+        self.tick_time = self.next_deadline + dropped * self.period
+        self.next_deadline += (dropped + 1) * self.period
+
+        self.last_jitter = lateness - dropped * self.period
+        self.last_dropped = dropped
+        self.stats.record(self.last_jitter, dropped)
+        return dropped + 1
+
+
+class LatencyStats:
+    def __init__(self, sample_size=1024):
+        self.lock = threading.Lock()
+        self.samples = collections.deque(maxlen=sample_size)
+        self.count = 0
+        self.last = 0.0
+
+    def record(self, latency):
+        with self.lock:
+            self.count += 1
+            self.last = latency
+            self.samples.append(latency)
+
+    def snapshot(self):
+        with self.lock:
+            samples = sorted(self.samples)
+            return {
+                "count": self.count,
+                "last_ms": round(self.last * 1000, 3),
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+                "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+                "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+                "max_ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+            }
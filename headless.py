@@ -0,0 +1,45 @@
+import argparse
+import signal
+import threading
+import time
+
+from lighting_service import LightingService, load_config
+
+CONFIG_FILE = "config.json"
+
+
+def log_message(message):
+    print(f"{time.strftime('[%H:%M:%S]')} {message}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the OSC -> DMX engine without the GUI.")
+    parser.add_argument("--config", default=CONFIG_FILE, help="path to config.json")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    config = load_config(args.config, log_message)
+    service = LightingService(config, log_message)
+
+    # Chases are registered without loading their frames, so OSC is listening straight away;
+    # the library is warmed in the background afterwards.
+    service.add_chases(config["chases"], preload=False)
+    service.start()
+    log_message(f"🚀 Headless engine ready in {(time.perf_counter() - started) * 1000:.0f} ms.")
+    service.preload_in_background()
+
+    shutdown = threading.Event()
+
+    def request_shutdown(signum, frame):
+        log_message("🔌 KeyboardInterrupt or termination signal received. Shutting down...")
+        shutdown.set()
+
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+    while not shutdown.is_set():
+        shutdown.wait(1.0)
+    service.stop()
+
+
+if __name__ == "__main__":
+    main()
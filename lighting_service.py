@@ -0,0 +1,238 @@
+import copy
+import json
+import queue
+import threading
+
+from artnet import ArtNetNode, ARTNET_PORT
+from chase_delta import ENCODING_AUTO
+from chase_library import NOT_RESIDENT, ChaseLibrary
+from chase_player import ChasePlayer
+from dmx_engine import DMXEngine, HTP
+from dmx_serial import DMXSerial, RESEND_ALWAYS
+from effects import EffectPlayer
+from interpolation import LINEAR
+from metrics import MetricsServer
+from osc_handler import OSCHandler, MODE_THREADED
+
+DEFAULT_CONFIG = {
+    "com_port": "",
+    "baud_rate": 115200,
+    "universes": [],
+    "framerate": 30,
+    "brightness": 255,
+    "merge_mode": HTP,
+    "ltp_channels": [],
+    "dmx_resend": RESEND_ALWAYS,
+    "dmx_keepalive": 0.8,
+    "dmx_slots": 0,
+    "log_max_lines": 1000,
+    "osc_port": 8000,
+    "osc_mode": MODE_THREADED,
+    "chase_memory_mb": 256,
+    "chase_encoding": ENCODING_AUTO,
+    "metrics_port": 9100,
+    "osc_master": "/master",
+    "chases": []
+}
+
+
+def load_config(path, log_func=print):
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        log_func(f"⚠️ Config file {path} not found, using defaults.")
+        config = {}
+    except json.JSONDecodeError as e:
+        log_func(f"❌ JSON error in config file: {e}")
+        config = {}
+    return {**copy.deepcopy(DEFAULT_CONFIG), **config}
+
+
+def fader_value(value, full_scale=255):
+    # Control surfaces send faders as 0.0-1.0 floats; integers are taken as already scaled.
+    if isinstance(value, float) and 0.0 <= value <= 1.0:
+        return value * full_scale
+    return value
+
+
+def build_outputs(config, log_func=print):
+    # "universes" maps 1-based universe numbers to serial ports or Art-Net destinations;
+    # without it the global com_port/baud_rate drive universe 1 as before.
+    universes = config.get("universes") or [{"universe": 1, "com_port": config["com_port"], "baud_rate": config["baud_rate"]}]
+    outputs = []
+    used_ports = set()
+    artnet_nodes = {}
+    for entry in universes:
+        if entry.get("type") == "artnet":
+            key = (entry.get("host", "255.255.255.255"), entry.get("port", ARTNET_PORT))
+            if key not in artnet_nodes:
+                artnet_nodes[key] = ArtNetNode(key[0], key[1], log_func)
+            net_universe = entry.get("net_universe", entry.get("universe", 1) - 1)
+            outputs.append((entry.get("universe", 1) - 1, artnet_nodes[key].universe(net_universe)))
+            continue
+
+        port = entry.get("com_port", "")
+        if port and port in used_ports:
+            log_func(f"⚠️ Serial port {port} is already assigned to another universe.")
+            continue
+        used_ports.add(port)
+        dmx = DMXSerial(port, entry.get("baud_rate", config["baud_rate"]), log_func,
+                        config.get("dmx_resend", RESEND_ALWAYS), config.get("dmx_keepalive", 0.8),
+                        slots=entry.get("slots", config.get("dmx_slots", 0)))
+        outputs.append((entry.get("universe", 1) - 1, dmx))
+    return outputs
+
+
+class LightingService:
+    # The OSC -> DMX engine without any GUI: outputs, mixer, chase library, OSC and metrics.
+    # Used directly by headless.py and wrapped by LightingApp in main.py.
+    def __init__(self, config, log_func=print):
+        self.config = config
+        self.log = log_func
+        self.chase_players = []
+        self.player_handlers = {}  # player -> [(address, callback), ...] registered for it
+
+        self.library = ChaseLibrary(config.get("chase_memory_mb", 256), log_func, config.get("chase_encoding", ENCODING_AUTO))
+        self.dmx_outputs = build_outputs(config, log_func)
+        self.engine = DMXEngine(self.dmx_outputs, config["framerate"], config.get("merge_mode", HTP), config.get("ltp_channels"), config["brightness"], log_func)
+        self.metrics_server = MetricsServer(config["metrics_port"], log_func=log_func) if config.get("metrics_port") else None
+        self.osc = OSCHandler(config.get("osc_port", 8000), log_func, config.get("osc_mode", MODE_THREADED),
+                              scheduler=self.engine.scheduler)
+        self.preload_thread = None
+        self.load_queue = queue.Queue()  # (player, due, trigger_time) for triggers whose chase is not in memory
+        self.loader_thread = None
+        self.register_master_controls()
+
+    def start(self):
+        # OSC goes up first so triggers are accepted immediately; serial ports can be slow to open.
+        self.loader_thread = threading.Thread(target=self._load_triggered, name="chase-loader", daemon=True)
+        self.loader_thread.start()
+        self.osc.start()
+        self.engine.start()
+        for _, dmx in self.dmx_outputs:
+            dmx.open()
+            if isinstance(dmx, DMXSerial):
+                dmx.start_writer()
+                if dmx.patched_slots and self.engine.framerate > dmx.max_refresh():
+                    self.log(f"⚠️ {dmx.port} can only refresh {dmx.max_refresh():.0f} fps; frames above that are dropped.")
+        if self.metrics_server:
+            self.metrics_server.start()
+
+    def stop(self):
+        self.osc.stop()
+        if self.loader_thread:
+            self.load_queue.put(None)
+            self.loader_thread.join()
+            self.loader_thread = None
+        self.engine.stop()
+        for _, dmx in self.dmx_outputs:
+            dmx.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
+
+    def create_player(self, chase_data, preload=True):
+        if chase_data.get("effect"):
+            player = EffectPlayer(chase_data, self.engine, self.log, chase_data.get("loop", True),
+                                  chase_data.get("mute", False), chase_data.get("level", 255))
+            self.chase_players.append(player)
+            return player
+
+        player = ChasePlayer(chase_data.get("file", ""), chase_data.get("loop", False), chase_data.get("mute", False),
+                             chase_data.get("level", 255), self.engine, self.log, self.library, chase_data.get("stream"), preload,
+                             chase_data.get("source_fps"), chase_data.get("interpolation", LINEAR), chase_data.get("channel_interpolation"))
+        self.chase_players.append(player)
+        return player
+
+    def register_player(self, address, player):
+        # Chases may share a cue address; each keeps its own handlers so it can be removed alone.
+        handlers = self.player_handlers.setdefault(player, [])
+        cue_address = address if address.startswith("/") else f"/{address}"
+        handlers.append((cue_address, self.osc.register_chase(address, lambda addr, *args: self.schedule_play(player))))
+        address = self.control_prefix(address)
+        if not address:
+            return
+        for control, key, apply in (("level", (player, "level"), lambda value: player.set_level(fader_value(value))),
+                                    ("speed", (player, "speed"), player.set_speed),
+                                    ("loop", (player, "loop"), lambda value: setattr(player, "loop", bool(value))),
+                                    ("stop", (player, "stop"), lambda value: player.stop())):
+            control_address = f"{address}/{control}"
+            handlers.append((control_address, self.register_control(control_address, key, apply)))
+        self.log(f"🎚️ Live controls: {address}/level, /speed, /loop, /stop")
+
+    def remove_player(self, address, player):
+        player.stop()
+        if player in self.chase_players:
+            self.chase_players.remove(player)
+        for index, (handler_address, callback) in enumerate(self.player_handlers.pop(player, [])):
+            self.osc.unregister_chase(handler_address, callback, announce=index == 0)
+
+    def control_prefix(self, address):
+        address = address.strip().rstrip("/")
+        if address and not address.startswith("/"):
+            address = f"/{address}"
+        return address
+
+    def schedule_play(self, player):
+        # Starts on the output tick nearest the bundle timetag (or straight away for plain
+        # messages), together with every other chase triggered by the same packet. Latency is
+        # measured from whichever is later, arrival or the requested start. Neither this OSC
+        # thread nor the engine thread loads anything: a chase that is not in memory (never
+        # loaded, evicted, or changed on disk) goes to the loader thread and is cued once resident.
+        due = self.osc.cue_time()
+        trigger_time = max(self.osc.receipt_time() or due, due)
+        prepared = player.prepare(load=False)
+        if prepared is NOT_RESIDENT:
+            self.load_queue.put((player, due, trigger_time))
+        elif prepared is not None:
+            self.cue_start(player, prepared, due, trigger_time)
+
+    def cue_start(self, player, prepared, due, trigger_time):
+        self.engine.schedule(due, lambda: player.start(prepared, trigger_time))
+
+    def _load_triggered(self):
+        while True:
+            item = self.load_queue.get()
+            if item is None:
+                return
+            player, due, trigger_time = item
+            prepared = player.prepare()
+            if prepared is not None:
+                # Usually overdue by now; the engine starts overdue cues on its next tick.
+                self.cue_start(player, prepared, due, trigger_time)
+
+    def register_master_controls(self):
+        address = self.config.get("osc_master", "/master").rstrip("/")
+        if not address:
+            return
+        self.register_control(f"{address}/brightness", "master_brightness",
+                              lambda value: self.engine.set_master_brightness(fader_value(value)))
+        self.log(f"🎚️ Live control: {address}/brightness")
+
+    def register_control(self, address, key, apply):
+        # Fader streams are coalesced in the engine: only the newest value per key is applied,
+        # once, at the start of the next tick.
+        def handler(addr, *args):
+            self.engine.submit_control(key, apply, args[0] if args else None)
+
+        return self.osc.register_chase(address, handler, announce=False)
+
+    def add_chases(self, chases, preload=False):
+        for chase_data in chases:
+            player = self.create_player(chase_data, preload)
+            self.register_player(chase_data.get("osc", ""), player)
+
+    def preload_in_background(self):
+        # Warms the chase library after startup; a trigger that arrives first has its own chase
+        # loaded by the loader thread.
+        players = [player for player in self.chase_players if not player.preloaded]
+        if not players:
+            return
+
+        def preload():
+            for player in players:
+                player.valid_csv = player.load_csv()
+            self.log(f"✅ Preloaded {len(players)} chases.")
+
+        self.preload_thread = threading.Thread(target=preload, name="chase-preload", daemon=True)
+        self.preload_thread.start()
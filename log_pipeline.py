@@ -0,0 +1,51 @@
+import collections
+import threading
+import time
+
+
+class LogPipeline:
+    # Producers (playback, OSC and serial threads) only append to a bounded deque, which is
+    # safe without a lock; a single consumer drains it in batches on its own schedule.
+    def __init__(self, capacity=5000):
+        self.queue = collections.deque(maxlen=capacity)
+        self.drain_lock = threading.Lock()
+        self.last_message = None
+        self.last_count = 0
+
+    def push(self, message):
+        self.queue.append((time.time(), message))
+
+    def drain(self, limit=500):
+        # Returns [timestamp, message, count, repeats_previous] entries. Consecutive duplicates
+        # are coalesced into one entry with a counter; repeats_previous marks an entry that
+        # continues the last message of the previous batch, so the consumer can update it.
+        entries = []
+        with self.drain_lock:
+            for _ in range(limit):
+                try:
+                    created, message = self.queue.popleft()
+                except IndexError:
+                    break
+
+                if message == self.last_message:
+                    self.last_count += 1
+                    if entries:
+                        entries[-1][0] = created
+                        entries[-1][2] = self.last_count
+                    else:
+                        entries.append([created, message, self.last_count, True])
+                    continue
+
+                self.last_message = message
+                self.last_count = 1
+                entries.append([created, message, 1, False])
+
+        for entry in entries:
+            entry[0] = time.strftime("[%H:%M:%S]", time.localtime(entry[0]))
+        return entries
+
+
+def format_entry(timestamp, message, count):
+    if count > 1:
+        return f"{timestamp} {message} (x{count})"
+    return f"{timestamp} {message}"
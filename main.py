@@ -5,12 +5,120 @@ import os
 import time
 import signal
 import sys
-from serial.tools import list_ports
-from dmx_serial import DMXSerial
-from osc_handler import OSCHandler
-from chase_player import ChasePlayer
+from lighting_service import LightingService, load_config
+from log_pipeline import LogPipeline, format_entry
 
 CONFIG_FILE = "config.json"
+LOG_FLUSH_MS = 100
+SAVE_DELAY_MS = 1000  # config edits are written once the user pauses, not on every change
+ROW_HEIGHT = 84
+
+
+def chase_value(chase, key):
+    # A chase block field as the player sees it, with create_player's defaults filled in.
+    if key == "loop":
+        return chase.get("loop", bool(chase.get("effect")))
+    if key == "mute":
+        return chase.get("mute", False)
+    return chase.get(key, "")
+
+
+class ChaseRow:
+    # One recycled row of the chase list. Only enough rows to fill the window exist; scrolling
+    # re-points them at other chases with bind().
+    def __init__(self, app, parent):
+        self.app = app
+        self.index = None
+        self.binding = False
+        self.effect = False  # effect rows show their type instead of a CSV file
+        self.frame = ttk.LabelFrame(parent, text="Chase")
+
+        self.osc_var = tk.StringVar()
+        self.file_var = tk.StringVar()
+        self.loop_var = tk.BooleanVar()
+        self.mute_var = tk.BooleanVar()
+
+        ttk.Label(self.frame, text="OSC Address:").grid(row=0, column=0, padx=5, pady=2)
+        osc_entry = ttk.Entry(self.frame, textvariable=self.osc_var, width=15)
+        osc_entry.grid(row=0, column=1, padx=5, pady=2)
+
+        self.file_label = ttk.Label(self.frame, text="CSV File:")
+        self.file_label.grid(row=0, column=2, padx=5, pady=2)
+        self.file_entry = file_entry = ttk.Entry(self.frame, textvariable=self.file_var, width=25)
+        file_entry.grid(row=0, column=3, padx=5, pady=2)
+        self.browse_btn = ttk.Button(self.frame, text="Browse", command=self.browse)
+        self.browse_btn.grid(row=0, column=4, padx=5)
+
+        self.loop_btn = ttk.Button(self.frame, text="Play Once", command=self.toggle_loop, width=10)
+        self.loop_btn.grid(row=1, column=0, padx=5)
+
+        ttk.Checkbutton(self.frame, text="Mute", variable=self.mute_var, command=self.toggle_mute).grid(row=1, column=1, padx=5)
+        ttk.Button(self.frame, text="Play", command=self.play).grid(row=1, column=2, padx=5)
+        ttk.Button(self.frame, text="Remove", command=self.remove).grid(row=1, column=3, padx=5)
+
+        for entry in (osc_entry, file_entry):
+            entry.bind("<FocusOut>", lambda e: self.commit())
+            entry.bind("<Return>", lambda e: self.commit())
+
+    def bind(self, index, chase):
+        if index == self.index:
+            return
+        self.commit()
+        self.index = index
+        self.frame.configure(text=f"Chase {index + 1}")
+        self.effect = bool(chase.get("effect"))
+        self.osc_var.set(chase_value(chase, "osc"))
+        if self.effect:
+            self.file_label.config(text="Effect:")
+            self.file_var.set(chase_value(chase, "effect"))
+            self.file_entry.config(state="readonly")
+            self.browse_btn.grid_remove()
+        else:
+            self.file_label.config(text="CSV File:")
+            self.file_var.set(chase_value(chase, "file"))
+            self.file_entry.config(state="normal")
+            self.browse_btn.grid()
+        self.loop_var.set(chase_value(chase, "loop"))
+        self.mute_var.set(chase_value(chase, "mute"))
+        self.loop_btn.config(text="Loop" if self.loop_var.get() else "Play Once")
+
+    def unbind(self):
+        self.commit()
+        self.index = None
+
+    def commit(self):
+        # Entry edits are applied when the field loses focus or Return is pressed.
+        if self.index is None:
+            return
+        changes = {"osc": self.osc_var.get()}
+        if not self.effect:
+            changes["file"] = self.file_var.get()
+        self.app.update_chase(self.index, changes)
+
+    def browse(self):
+        self.app.select_file(self.file_var)
+        self.commit()
+
+    def toggle_loop(self):
+        self.loop_var.set(not self.loop_var.get())
+        self.loop_btn.config(text="Loop" if self.loop_var.get() else "Play Once")
+        if self.index is not None:
+            self.app.update_chase(self.index, {"loop": self.loop_var.get()})
+
+    def toggle_mute(self):
+        if self.index is not None:
+            self.app.update_chase(self.index, {"mute": self.mute_var.get()})
+
+    def play(self):
+        self.commit()
+        if self.index is not None:
+            self.app.play_chase(self.index)
+
+    def remove(self):
+        if self.index is not None:
+            index, self.index = self.index, None
+            self.app.remove_chase(index)
+
 
 class LightingApp:
     def __init__(self, root):
@@ -20,62 +128,69 @@ class LightingApp:
         self.root.resizable(False, True)
         self.root.configure(bg="#111")
 
+        self.log_pipeline = LogPipeline()
         self.config = self.load_config()
-        self.chase_blocks = []
-        self.chase_players = []
+        self.log_max_lines = self.config.get("log_max_lines", 1000)
+        self.save_job = None
 
-        self.dmx = DMXSerial(self.config["com_port"], self.config["baud_rate"], self.log_message)
-        self.osc = OSCHandler(8000, self.log_message)
+        self.service = LightingService(self.config, self.log_message)
+        self.library = self.service.library
+        self.engine = self.service.engine
+        self.osc = self.service.osc
+
+        # config["chases"] is the model; self.players runs parallel to it. Frames are loaded by
+        # the background preload (or on first trigger), and rows exist only for what is visible.
+        self.service.add_chases(self.config["chases"], preload=False)
+        self.players = list(self.service.chase_players)
+        self.rows = []
+        self.first_row = 0
 
         self.setup_gui()
+        self.flush_log()
         self.setup_signal_handlers()
-        self.dmx.open()
-        self.osc.start()
+        self.service.start()
+        self.service.preload_in_background()
 
         self.log_message("App started.")
         
     def setup_signal_handlers(self):
         signal.signal(signal.SIGINT, self.graceful_shutdown)
         signal.signal(signal.SIGTERM, self.graceful_shutdown)
+        # Closing the window must also flush an edit still waiting on the save debounce.
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        self.save_config()
+        self.service.stop()
+        self.root.destroy()
 
     def graceful_shutdown(self, signum, frame):
         self.log_message("🔌 KeyboardInterrupt or termination signal received. Shutting down...")
         self.save_config()
+        self.service.stop()
         self.root.quit()
         sys.exit(0)
 
     def load_config(self):
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON error in config file: {e}")
-            return {
-                "com_port": "",
-                "baud_rate": 115200,
-                "framerate": 30,
-                "brightness": 255,
-                "chases": []
-            }
+        return load_config(CONFIG_FILE, print)
+
+    def schedule_save(self):
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+        self.save_job = self.root.after(SAVE_DELAY_MS, self.save_config)
 
     def save_config(self):
+        for row in self.rows:
+            row.commit()
+        if self.save_job is not None:
+            self.root.after_cancel(self.save_job)
+            self.save_job = None
+
         self.config["com_port"] = self.com_port_var.get()
         self.config["baud_rate"] = self.baud_rate_var.get()
         self.config["framerate"] = self.framerate_var.get()
         self.config["brightness"] = self.brightness_var.get()
 
-        # Serialize chase block data if it's not already a list of dicts
-        serialized_chases = []
-        for block in self.chase_blocks:
-            if isinstance(block, dict):
-                serialized_chases.append(block)
-            elif hasattr(block, 'get'):
-                serialized_chases.append(block.get())
-            else:
-                self.log_message("⚠️ Could not serialize a chase block.")
-        
-        self.config["chases"] = serialized_chases
-
         try:
             with open(CONFIG_FILE, 'w') as f:
                 json.dump(self.config, f, indent=2)
@@ -99,7 +214,8 @@ class LightingApp:
 
         ttk.Label(top_frame, text="COM Port:").grid(row=0, column=0, padx=5, pady=5)
         self.com_port_var = tk.StringVar(value=self.config["com_port"])
-        self.com_port_dropdown = ttk.Combobox(top_frame, textvariable=self.com_port_var, values=self.get_serial_ports(), width=15)
+        # Ports are enumerated when the dropdown opens, not while the window is being built.
+        self.com_port_dropdown = ttk.Combobox(top_frame, textvariable=self.com_port_var, width=15, postcommand=self.refresh_serial_ports)
         self.com_port_dropdown.grid(row=0, column=1, padx=5, pady=5)
 
         ttk.Label(top_frame, text="Baud Rate:").grid(row=0, column=2, padx=5, pady=5)
@@ -116,22 +232,17 @@ class LightingApp:
         self.brightness_var = tk.IntVar(value=self.config["brightness"])
         self.brightness_slider = ttk.Scale(top_frame, from_=0, to=255, variable=self.brightness_var, orient="horizontal", length=100)
         self.brightness_slider.grid(row=0, column=7, padx=5, pady=5)
+        self.brightness_var.trace_add("write", lambda *args: self.on_brightness_change())
 
         chases_frame = ttk.LabelFrame(self.root, text="Light Chases")
         chases_frame.pack(fill="both", expand=True, padx=10, pady=(5, 0))
-        self.canvas = tk.Canvas(chases_frame, bg="#111", highlightthickness=0)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-
-        scrollbar = ttk.Scrollbar(chases_frame, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-
-        for chase in self.config["chases"]:
-            self.add_chase_block(chase)
+        self.chase_scrollbar = ttk.Scrollbar(chases_frame, orient="vertical", command=self.on_chase_scroll)
+        self.chase_scrollbar.pack(side="right", fill="y")
+        self.chase_list = ttk.Frame(chases_frame)
+        self.chase_list.pack(side="left", fill="both", expand=True)
+        self.chase_list.bind("<Configure>", lambda e: self.refresh_chase_list())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.root.bind_all(sequence, self.on_mouse_wheel, add="+")
 
         self.add_chase_button = ttk.Button(self.root, text="Add Light Chase", command=self.add_chase_block)
         self.add_chase_button.pack(pady=5)
@@ -141,73 +252,131 @@ class LightingApp:
         self.console_text = scrolledtext.ScrolledText(console_frame, height=8, state='disabled', background="#111", foreground="white", insertbackground="white")
         self.console_text.pack(fill="x")
 
+    def on_brightness_change(self):
+        try:
+            self.engine.set_master_brightness(self.brightness_var.get())
+        except tk.TclError:
+            pass
+
     def get_serial_ports(self):
+        from serial.tools import list_ports
         return [port.device for port in list_ports.comports()]
 
+    def refresh_serial_ports(self):
+        self.com_port_dropdown.configure(values=self.get_serial_ports())
+
     def log_message(self, message):
-        timestamp = time.strftime("[%H:%M:%S]")
-        if hasattr(self, "console_text"):
+        # Safe from any thread: the Tk widget is only touched by flush_log on the Tk thread.
+        self.log_pipeline.push(message)
+
+    def flush_log(self):
+        entries = self.log_pipeline.drain()
+        if entries:
             self.console_text.configure(state='normal')
-            self.console_text.insert('end', f"{timestamp} {message}\n")
+            for timestamp, message, count, repeats_previous in entries:
+                if repeats_previous:
+                    self.console_text.delete('end-2l', 'end-1l')
+                self.console_text.insert('end', format_entry(timestamp, message, count) + "\n")
+
+            line_count = int(self.console_text.index('end-1c').split('.')[0]) - 1
+            if line_count > self.log_max_lines:
+                self.console_text.delete('1.0', f"{line_count - self.log_max_lines + 1}.0")
             self.console_text.configure(state='disabled')
             self.console_text.yview_moveto(1)
-        else:
-            print(f"{timestamp} {message}")
-
-    def add_chase_block(self, chase_data=None):
-        frame = ttk.LabelFrame(self.scrollable_frame, text="Chase")
-        frame.pack(fill="x", padx=5, pady=5)
-
-        osc_var = tk.StringVar(value=chase_data.get("osc", "") if chase_data else "")
-        file_var = tk.StringVar(value=chase_data.get("file", "") if chase_data else "")
-        loop_var = tk.BooleanVar(value=chase_data.get("loop", False) if chase_data else False)
-        mute_var = tk.BooleanVar(value=chase_data.get("mute", False) if chase_data else False)
-
-        def toggle_loop():
-            loop_var.set(not loop_var.get())
-            loop_btn.config(text="Loop" if loop_var.get() else "Play Once")
-
-        ttk.Label(frame, text="OSC Address:").grid(row=0, column=0, padx=5, pady=2)
-        osc_entry = ttk.Entry(frame, textvariable=osc_var, width=15)
-        osc_entry.grid(row=0, column=1, padx=5, pady=2)
-
-        ttk.Label(frame, text="CSV File:").grid(row=0, column=2, padx=5, pady=2)
-        file_entry = ttk.Entry(frame, textvariable=file_var, width=25)
-        file_entry.grid(row=0, column=3, padx=5, pady=2)
-        ttk.Button(frame, text="Browse", command=lambda: self.select_file(file_var)).grid(row=0, column=4, padx=5)
-
-        loop_btn = ttk.Button(frame, text="Loop" if loop_var.get() else "Play Once", command=toggle_loop, width=10)
-        loop_btn.grid(row=1, column=0, padx=5)
-
-        ttk.Checkbutton(frame, text="Mute", variable=mute_var).grid(row=1, column=1, padx=5)
-        ttk.Button(frame, text="Play", command=lambda: self.play_chase(file_var.get(), loop_var.get(), mute_var.get())).grid(row=1, column=2, padx=5)
-        ttk.Button(frame, text="Remove", command=lambda: self.remove_chase_block(frame, chase_data)).grid(row=1, column=3, padx=5)
-
-        player = ChasePlayer(file_var.get(), loop_var.get(), mute_var.get(), self.framerate_var.get(), self.brightness_var.get(), self.dmx, self.log_message)
-        self.chase_players.append(player)
-
-        self.osc.register_chase(osc_var.get(), lambda addr, *args: player.play())
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+
+    def visible_rows(self):
+        return max(1, self.chase_list.winfo_height() // ROW_HEIGHT)
+
+    def refresh_chase_list(self):
+        chases = self.config["chases"]
+        visible = self.visible_rows()
+        self.first_row = max(0, min(self.first_row, len(chases) - visible))
+        while len(self.rows) < visible + 1:
+            self.rows.append(ChaseRow(self, self.chase_list))
+
+        for slot, row in enumerate(self.rows):
+            index = self.first_row + slot
+            if slot <= visible and index < len(chases):
+                row.bind(index, chases[index])
+                row.frame.place(x=5, y=slot * ROW_HEIGHT, relwidth=1, width=-10, height=ROW_HEIGHT - 6)
+            else:
+                if row.index is not None:
+                    row.unbind()
+                row.frame.place_forget()
 
+        if chases:
+            self.chase_scrollbar.set(self.first_row / len(chases), min(1.0, (self.first_row + visible) / len(chases)))
+        else:
+            self.chase_scrollbar.set(0.0, 1.0)
+
+    def scroll_chases_to(self, first_row):
+        self.first_row = first_row
+        self.refresh_chase_list()
+
+    def on_chase_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_chases_to(int(float(amount) * len(self.config["chases"])))
+        elif action == "scroll":
+            step = 1 if unit == "units" else self.visible_rows()
+            self.scroll_chases_to(self.first_row + int(amount) * step)
+
+    def on_mouse_wheel(self, event):
+        # Bound on "all" so the wheel works over any widget inside a row, not just row frames.
+        widget = self.root.winfo_containing(event.x_root, event.y_root)
+        path, list_path = str(widget), str(self.chase_list)
+        if widget is None or not (path == list_path or path.startswith(list_path + ".")):
+            return
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.scroll_chases_to(self.first_row - 1 if up else self.first_row + 1)
+
+    def add_chase_block(self):
+        chase = {"osc": "", "file": "", "loop": False, "mute": False}
+        self.config["chases"].append(chase)
+        player = self.service.create_player(chase, preload=False)
+        self.service.register_player(chase["osc"], player)
+        self.players.append(player)
         self.log_message("Added new chase block.")
-        if not chase_data:
-            self.config["chases"].append({"osc": osc_var.get(), "file": file_var.get(), "loop": loop_var.get(), "mute": mute_var.get()})
-            self.save_config()
+        self.scroll_chases_to(len(self.config["chases"]))
+        self.schedule_save()
+
+    def update_chase(self, index, changes):
+        chase = self.config["chases"][index]
+        changed = {key: value for key, value in changes.items() if chase_value(chase, key) != value}
+        if not changed:
+            return
+
+        player = self.players[index]
+        old_address = chase.get("osc", "")
+        chase.update(changed)
+        if "osc" in changed or "file" in changed:
+            # The address or the file changed: swap in a fresh player under the new address.
+            self.service.remove_player(old_address, player)
+            player = self.service.create_player(chase, preload=False)
+            self.service.register_player(chase.get("osc", ""), player)
+            self.players[index] = player
+        else:
+            player.loop = chase_value(chase, "loop")
+            player.mute = chase_value(chase, "mute")
+        self.schedule_save()
+
+    def remove_chase(self, index):
+        chase = self.config["chases"].pop(index)
+        self.service.remove_player(chase.get("osc", ""), self.players.pop(index))
+        for row in self.rows:
+            row.index = None  # indices shifted; rebind every row without committing stale fields
+        self.refresh_chase_list()
+        self.schedule_save()
+        self.log_message("Removed chase block.")
 
     def select_file(self, var):
         path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if path:
             var.set(path)
 
-    def play_chase(self, filepath, loop, mute):
-        player = ChasePlayer(filepath, loop, mute, self.framerate_var.get(), self.brightness_var.get(), self.dmx, self.log_message)
-        player.play()
-
-    def remove_chase_block(self, frame, chase_data):
-        frame.destroy()
-        if chase_data in self.config["chases"]:
-            self.config["chases"].remove(chase_data)
-            self.save_config()
-        self.log_message("Removed chase block.")
+    def play_chase(self, index):
+        self.engine.framerate = self.framerate_var.get()
+        self.players[index].play()
 
 if __name__ == "__main__":
     root = tk.Tk()
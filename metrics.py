@@ -0,0 +1,158 @@
+import bisect
+import http.server
+import threading
+
+# Seconds; spans sub-100µs hot-path stages up to a full second of stall.
+TIME_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+# Instruments are updated without locks so they can stay on during shows. Almost all are written
+# from a single thread (the engine, one serial writer, the OSC loop); a scrape that sees a
+# half-applied update, or a rare lost increment from threaded OSC, is harmless.
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, getter=None):
+        self.value = 0
+        self.getter = getter
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self, name, labels):
+        yield name, labels, self.getter() if self.getter else self.value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets=TIME_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{name}_bucket", labels + (("le", repr(bound)),), cumulative
+        yield f"{name}_bucket", labels + (("le", "+Inf"),), self.count
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, self.count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = {}  # name -> (kind, help, {labels: instrument})
+
+    def counter(self, name, help_text="", **labels):
+        return self._get(name, help_text, labels, Counter)
+
+    def gauge(self, name, help_text="", getter=None, **labels):
+        return self._get(name, help_text, labels, lambda: Gauge(getter))
+
+    def histogram(self, name, help_text="", buckets=TIME_BUCKETS, **labels):
+        return self._get(name, help_text, labels, lambda: Histogram(buckets))
+
+    def _get(self, name, help_text, labels, factory):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self.lock:
+            if name not in self.families:
+                instrument = factory()
+                self.families[name] = (instrument.kind, help_text, {key: instrument})
+                return instrument
+            instruments = self.families[name][2]
+            if key not in instruments:
+                instruments[key] = factory()
+            return instruments[key]
+
+    def render(self):
+        # Prometheus text exposition format.
+        lines = []
+        with self.lock:
+            families = [(name, kind, help_text, list(instruments.items()))
+                        for name, (kind, help_text, instruments) in sorted(self.families.items())]
+        for name, kind, help_text, instruments in families:
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, instrument in instruments:
+                for sample_name, sample_labels, value in instrument.samples(name, labels):
+                    lines.append(f"{sample_name}{_format_labels(sample_labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    def __init__(self, port=9100, host="127.0.0.1", registry=REGISTRY, log_func=print):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self.log = log_func
+        self.server = None
+        self.server_thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = http.server.ThreadingHTTPServer((self.host, self.port), Handler)
+            self.server_thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+            self.server_thread.start()
+            self.log(f"📈 Metrics available at http://{self.host}:{self.port}/metrics")
+        except OSError as e:
+            self.log(f"❌ Failed to start metrics server: {e}")
+            self.server = None
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -1,34 +1,147 @@
-from pythonosc import dispatcher, osc_server
+from pythonosc import dispatcher, osc_packet, osc_server
+import contextlib
+import select
+import socket
+import socketserver
 import threading
+import time
+
+from cue_scheduler import timetag_to_monotonic
+from metrics import REGISTRY
+
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+MODE_THREADED = "threaded"  # pythonosc ThreadingOSCUDPServer, one thread per datagram
+MODE_SINGLE = "single"      # one socket loop, exact-match dispatch, no thread per datagram
+
+
+class TimetagDispatcher(dispatcher.Dispatcher):
+    # pythonosc either ignores bundle timetags or, with strict timing, sleeps in the server thread
+    # until they are due. This runs handlers straight away and leaves the timetag on the handler
+    # so cues can be scheduled against the output clock instead.
+    def __init__(self, owner):
+        super().__init__()
+        self.owner = owner
+
+    def call_handlers_for_packet(self, data, client_address, receipt_time=None):
+        owner = self.owner
+        if receipt_time is None:
+            receipt_time = time.monotonic()
+        owner.local.receipt_time = receipt_time
+        owner.packets_received += 1
+        owner.metric_packets.inc()
+        try:
+            packet = osc_packet.OscPacket(data)
+        except osc_packet.ParseError:
+            owner.packet_errors += 1
+            owner.metric_errors.inc()
+            return []
+
+        with owner.packet_batch():
+            for timed_message in packet.messages:
+                owner.local.timetag = timed_message.time
+                message = timed_message.message
+                for handler in self.handlers_for_address(message.address):
+                    try:
+                        handler.invoke(client_address, message)
+                    except Exception as e:
+                        owner.log(f"❌ OSC handler for {message.address} failed: {e}")
+        owner.metric_dispatch.observe(time.monotonic() - receipt_time)
+        return []
+
+
+class _StampedUDPHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data, _, receipt_time = self.request
+        self.server.dispatcher.call_handlers_for_packet(data, self.client_address, receipt_time)
+
+
+class StampedOSCUDPServer(osc_server.ThreadingOSCUDPServer):
+    # Stamps each datagram on the serving thread, before a handler thread is spawned for it and
+    # before it is parsed, so receipt_time() measures arrival rather than thread start-up.
+    def __init__(self, server_address, dispatcher):
+        super().__init__(server_address, dispatcher)
+        self.RequestHandlerClass = _StampedUDPHandler
+
+    def process_request(self, request, client_address):
+        super().process_request((*request, time.monotonic()), client_address)
+
 
 class OSCHandler:
-    def __init__(self, port=8000, log_func=print):
+    def __init__(self, port=8000, log_func=print, mode=MODE_THREADED, batch_size=64, scheduler=None):
         self.port = port
         self.log = log_func
-        self.dispatcher = dispatcher.Dispatcher()
+        self.mode = mode
+        self.batch_size = batch_size
+        self.scheduler = scheduler  # CueScheduler; cues from one packet are released together
+        self.dispatcher = TimetagDispatcher(self)
         self.server = None
         self.server_thread = None
-        self.chase_callbacks = {}  # address -> callback
+        self.chase_callbacks = {}  # address -> [callback, ...], also the exact-match table in single mode
 
-    def register_chase(self, address, callback):
+        self.sock = None
+        self.stop_flag = threading.Event()
+        self.local = threading.local()
+        self.packets_received = 0
+        self.packet_errors = 0
+
+        self.metric_packets = REGISTRY.counter("osc_packets_total", "OSC packets received", mode=mode)
+        self.metric_errors = REGISTRY.counter("osc_packet_errors_total", "OSC packets that failed to parse", mode=mode)
+        self.metric_dispatch = REGISTRY.histogram("osc_dispatch_seconds", "Decode and handler time per OSC packet", mode=mode)
+        self.metric_batch = REGISTRY.histogram("osc_receive_batch_size", "Datagrams drained per socket wakeup", BATCH_BUCKETS, mode=mode)
+
+    def register_chase(self, address, callback, announce=True):
         if not address.startswith("/"):
             address = f"/{address}"
+
+        # Several chases may share a cue address; each registration adds a callback.
         self.dispatcher.map(address, callback)
-        self.chase_callbacks[address] = callback
-        self.log(f"🔗 Registered OSC address: {address}")
+        self.chase_callbacks.setdefault(address, []).append(callback)
+        if announce:
+            self.log(f"🔗 Registered OSC address: {address}")
+        return callback
 
-    def unregister_chase(self, address):
-        if address in self.chase_callbacks:
-            self.dispatcher.unmap(address, self.chase_callbacks[address])
+    def unregister_chase(self, address, callback=None, announce=True):
+        # Removes one callback, or every callback on the address when none is given.
+        if not address.startswith("/"):
+            address = f"/{address}"
+        callbacks = self.chase_callbacks.get(address)
+        if not callbacks:
+            return
+        for registered in ([callback] if callback is not None else list(callbacks)):
+            if registered in callbacks:
+                self.dispatcher.unmap(address, registered)
+                callbacks.remove(registered)
+        if not callbacks:
             del self.chase_callbacks[address]
+        if announce:
             self.log(f"🗑️ Unregistered OSC address: {address}")
 
+    def receipt_time(self):
+        # Monotonic time the packet being dispatched on this thread was received.
+        return getattr(self.local, "receipt_time", None)
+
+    def cue_time(self):
+        # Monotonic time the message being dispatched on this thread should take effect: its
+        # bundle timetag, or its arrival for plain messages and "immediately" bundles.
+        return timetag_to_monotonic(getattr(self.local, "timetag", None))
+
+    def packet_batch(self):
+        return self.scheduler.batch() if self.scheduler else contextlib.nullcontext()
+
     def start(self):
         try:
-            self.server = osc_server.ThreadingOSCUDPServer(("0.0.0.0", self.port), self.dispatcher)
-            self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+            if self.mode == MODE_SINGLE:
+                self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self.sock.bind(("0.0.0.0", self.port))
+                self.sock.setblocking(False)
+                self.stop_flag.clear()
+                self.server_thread = threading.Thread(target=self._serve_single, name="osc-ingest", daemon=True)
+            else:
+                self.server = StampedOSCUDPServer(("0.0.0.0", self.port), self.dispatcher)
+                self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.server_thread.start()
-            self.log(f"🎧 OSC Server listening on port {self.port}")
+            self.log(f"🎧 OSC Server listening on port {self.port} ({self.mode})")
         except Exception as e:
             self.log(f"❌ Failed to start OSC server: {e}")
 
@@ -37,3 +150,54 @@ class OSCHandler:
             self.server.shutdown()
             self.server.server_close()
             self.log("🛑 OSC server stopped.")
+        if self.sock:
+            self.stop_flag.set()
+            self.server_thread.join()
+            self.sock.close()
+            self.sock = None
+            self.log("🛑 OSC server stopped.")
+
+    def _serve_single(self):
+        sock = self.sock
+        while not self.stop_flag.is_set():
+            ready, _, _ = select.select([sock], [], [], 0.2)
+            if not ready:
+                continue
+            # Drain a burst in one go instead of going back to select for every datagram.
+            drained = 0
+            for _ in range(self.batch_size):
+                try:
+                    data, _ = sock.recvfrom(65535)
+                except BlockingIOError:
+                    break
+                except OSError as e:
+                    self.log(f"❌ OSC socket error: {e}")
+                    return
+                drained += 1
+                self._dispatch(data, time.monotonic())
+            self.metric_batch.observe(drained)
+
+    def _dispatch(self, data, receipt_time):
+        self.packets_received += 1
+        self.metric_packets.inc()
+        try:
+            packet = osc_packet.OscPacket(data)
+        except osc_packet.ParseError:
+            self.packet_errors += 1
+            self.metric_errors.inc()
+            return
+
+        self.local.receipt_time = receipt_time
+        with self.packet_batch():
+            for timed_message in packet.messages:
+                message = timed_message.message
+                callbacks = self.chase_callbacks.get(message.address)
+                if not callbacks:
+                    continue
+                self.local.timetag = timed_message.time
+                for callback in tuple(callbacks):
+                    try:
+                        callback(message.address, *message.params)
+                    except Exception as e:
+                        self.log(f"❌ OSC handler for {message.address} failed: {e}")
+        self.metric_dispatch.observe(time.monotonic() - receipt_time)
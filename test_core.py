@@ -0,0 +1,166 @@
+import random
+
+from artnet import ArtNetNode
+from chase_cache import FrameBuffer
+from chase_delta import ENCODING_AUTO, ENCODING_DELTA, DeltaCursor, DeltaFrames, encode_frames
+from dmx_engine import DMXEngine, HTP, LTP
+from interpolation import EASE, LINEAR, STEP, Interpolator, ease_in_out
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+def random_frame(rng, count):
+    return bytes(rng.randrange(256) for _ in range(count))
+
+
+def test_merge_matches_per_channel_reference():
+    # Two universes, so the lanes cross the 512-channel boundary; frames shorter than the
+    # universe leave the channels past them untouched.
+    rng = random.Random(1)
+    engine = DMXEngine([(1, object())], log_func=quiet)
+    count = engine.channel_count
+    ltp = {channel for channel in range(1, count + 1) if rng.random() < 0.3}
+
+    for mode, channels in ((HTP, None), (LTP, None), (LTP, ltp)):
+        engine.set_merge_mode(HTP)
+        engine.set_merge_mode(mode, channels)
+        mask = bytes(engine.ltp_mask)
+        universe = random_frame(rng, count)
+        engine.universe[:] = universe
+        for length in (count, 700, 3, 1):
+            frame = random_frame(rng, length)
+            expected = bytearray(universe)
+            for channel in range(length):
+                expected[channel] = frame[channel] if mask[channel] else max(universe[channel], frame[channel])
+            assert engine._merge(frame) == length
+            assert engine.universe == expected
+            universe = bytes(expected)
+
+
+def test_merge_htp_extremes():
+    engine = DMXEngine(log_func=quiet)
+    engine.universe[:4] = bytes([0, 255, 128, 127])
+    engine._merge(bytes([255, 0, 127, 128]))
+    assert engine.universe[:4] == bytes([255, 255, 128, 128])
+
+
+def reference_blend(a, b, fraction, modes):
+    result = bytearray(len(a))
+    for channel, mode in enumerate(modes):
+        if mode == STEP:
+            result[channel] = a[channel]
+            continue
+        weight = int((ease_in_out(fraction) if mode == EASE else fraction) * 256)
+        result[channel] = (a[channel] * (256 - weight) + b[channel] * weight) >> 8
+    return bytes(result)
+
+
+def test_blend_matches_per_channel_reference():
+    rng = random.Random(2)
+    channels = 600
+    per_channel = {channel: rng.choice((STEP, LINEAR, EASE)) for channel in range(1, channels + 1)}
+    cases = (
+        (LINEAR, None, [LINEAR] * channels),
+        (EASE, None, [EASE] * channels),
+        (STEP, None, [STEP] * channels),
+        (LINEAR, per_channel, [per_channel[channel] for channel in range(1, channels + 1)]),
+    )
+    for default_mode, channel_modes, modes in cases:
+        interpolator = Interpolator(channels, default_mode, channel_modes)
+        for fraction in (0.0, 0.001, 0.25, 0.5, 0.999):
+            a = random_frame(rng, channels)
+            b = random_frame(rng, channels)
+            assert bytes(interpolator.blend(a, b, fraction)) == reference_blend(a, b, fraction, modes)
+
+
+def test_blend_endpoints():
+    interpolator = Interpolator(4)
+    assert bytes(interpolator.blend(bytes(4), b"\xff" * 4, 0.5)) == b"\x7f" * 4
+    assert bytes(interpolator.blend(bytes(4), b"\xff" * 4, 0.999)) == b"\xfe" * 4
+    assert interpolator.blend(b"\x10" * 4, b"\xff" * 4, 0) == b"\x10" * 4
+
+
+def sparse_chase(rng, channels, frame_count, changes):
+    frame = bytearray(random_frame(rng, channels))
+    data = bytearray()
+    for _ in range(frame_count):
+        for _ in range(rng.randrange(changes + 1)):
+            frame[rng.randrange(channels)] = rng.randrange(256)
+        data += frame
+    return FrameBuffer(memoryview(bytes(data)), channels, frame_count)
+
+
+def test_delta_seek_matches_dense_frames():
+    rng = random.Random(3)
+    dense = sparse_chase(rng, 512, 200, 8)
+    frames = encode_frames(dense, ENCODING_DELTA)
+    assert isinstance(frames, DeltaFrames) and len(frames) == len(dense)
+
+    cursor = DeltaCursor(frames)
+    # Forward one at a time, jumps, standing still, and backwards (a loop wrapping around).
+    order = list(range(len(dense))) + [199, 0, 57, 57, 198, 3, 150, 10] + [rng.randrange(len(dense)) for _ in range(100)]
+    for index in order:
+        assert bytes(cursor.seek(index)) == bytes(dense[index])
+
+
+def test_delta_unchanged_and_auto_choice():
+    rng = random.Random(4)
+    still = FrameBuffer(memoryview(random_frame(rng, 64) * 10), 64, 10)
+    frames = encode_frames(still, ENCODING_AUTO)
+    assert isinstance(frames, DeltaFrames) and len(frames.slots) == 0
+    assert bytes(DeltaCursor(frames).seek(9)) == bytes(still[9])
+
+    # Every channel changing every frame is cheaper dense, so auto keeps it that way.
+    noisy = FrameBuffer(memoryview(random_frame(rng, 64 * 10)), 64, 10)
+    assert encode_frames(noisy, ENCODING_AUTO) is noisy
+
+
+def decode_artdmx(packet):
+    # Field by field as laid out in the Art-Net 4 spec, independent of artnet.ARTDMX_HEADER.
+    assert packet[:8] == b"Art-Net\x00"
+    length = packet[16] << 8 | packet[17]
+    return {
+        "opcode": packet[8] | packet[9] << 8,
+        "version": packet[10] << 8 | packet[11],
+        "sequence": packet[12],
+        "physical": packet[13],
+        "universe": packet[14] | (packet[15] & 0x7F) << 8,
+        "length": length,
+        "data": bytes(packet[18:18 + length]),
+        "size": len(packet),
+    }
+
+
+def test_artdmx_packet_layout():
+    node = ArtNetNode(log_func=quiet)
+    output = node.universe(0x1234)
+    frame = bytes(range(1, 6))
+    output.send_dmx_frame(frame)
+    packet = decode_artdmx(output.packet_view[:output.packet_length])
+    assert packet == {
+        "opcode": 0x5000,
+        "version": 14,
+        "sequence": 1,
+        "physical": 0,
+        "universe": 0x1234,
+        "length": 6,  # padded to an even slot count
+        "data": frame + b"\x00",
+        "size": 18 + 6,
+    }
+
+    output.send_dmx_frame(bytes(range(256)) * 3)
+    packet = decode_artdmx(output.packet_view[:output.packet_length])
+    assert packet["length"] == 512 and packet["data"] == bytes(range(256)) * 2
+    assert packet["sequence"] == 2
+
+
+def test_artdmx_sequence_skips_zero():
+    output = ArtNetNode(log_func=quiet).universe(0)
+    sequences = []
+    for _ in range(256):
+        output.send_dmx_frame(b"\x00")
+        sequences.append(decode_artdmx(output.packet_view[:output.packet_length])["sequence"])
+    assert sequences[:2] == [1, 2] and sequences[254:] == [255, 1]
+    assert decode_artdmx(output.packet_view[:output.packet_length])["length"] == 2